@@ -6,24 +6,16 @@ Apply discovered ASIN seeds to .env without manual editing.
 from __future__ import annotations
 
 import argparse
+import re
 from pathlib import Path
 from typing import Dict, List
 
+_ASIN_SCAN = re.compile(r"\bB[A-Z0-9]{9}\b")
+
 
 def parse_asins(raw: str) -> List[str]:
-    asins = []
-    for token in raw.replace("\n", ",").split(","):
-        value = token.strip().upper()
-        if len(value) == 10 and value.startswith("B"):
-            asins.append(value)
-    # Preserve order, remove duplicates
-    seen = set()
-    ordered = []
-    for asin in asins:
-        if asin not in seen:
-            seen.add(asin)
-            ordered.append(asin)
-    return ordered
+    # One regex pass over the whole file; dict.fromkeys keeps first-seen order.
+    return list(dict.fromkeys(_ASIN_SCAN.findall(raw.upper())))
 
 
 def update_env_file(env_path: Path, updates: Dict[str, str]) -> None:
@@ -32,28 +24,29 @@ def update_env_file(env_path: Path, updates: Dict[str, str]) -> None:
     else:
         lines = []
 
-    remaining = dict(updates)
-    new_lines = []
-    for line in lines:
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#") or "=" not in line:
-            new_lines.append(line)
+    # Index assignment lines by key once, then patch them in place.
+    key_to_idx: Dict[str, List[int]] = {}
+    for idx, line in enumerate(lines):
+        stripped = line.lstrip()
+        if not stripped or stripped[0] == "#" or "=" not in line:
             continue
+        key_to_idx.setdefault(line.split("=", 1)[0].strip(), []).append(idx)
 
-        key = line.split("=", 1)[0].strip()
-        if key in updates:
-            new_lines.append(f"{key}={updates[key]}")
-            remaining.pop(key, None)
-        else:
-            new_lines.append(line)
+    missing = []
+    for key, value in updates.items():
+        indices = key_to_idx.get(key)
+        if not indices:
+            missing.append(f"{key}={value}")
+            continue
+        for idx in indices:
+            lines[idx] = f"{key}={value}"
 
-    if remaining:
-        if new_lines and new_lines[-1].strip():
-            new_lines.append("")
-        for key, value in remaining.items():
-            new_lines.append(f"{key}={value}")
+    if missing:
+        if lines and lines[-1].strip():
+            lines.append("")
+        lines.extend(missing)
 
-    env_path.write_text("\n".join(new_lines) + "\n", encoding="utf-8")
+    env_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
 
 def main() -> int:
@@ -15,20 +15,26 @@ Output:
 from __future__ import annotations
 
 import argparse
-import json
+import gzip
+import hashlib
 import os
-import re
 import sys
+import threading
 import time
-from dataclasses import asdict, dataclass
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from functools import partial
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
 from urllib.parse import quote_plus
-from urllib.request import Request, urlopen
 
+import httpx
 
-ASIN_RE = re.compile(r"^B[A-Z0-9]{9}$")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.utils.json_codec import json_dumps, json_dumps_pretty, json_loads
 
 MARKETS: Dict[str, Dict[str, Any]] = {
     "DE": {
@@ -109,8 +115,27 @@ MARKETS: Dict[str, Dict[str, Any]] = {
 
 DEFAULT_BESTSELLER_RANGES = [0, 30, 60, 90, 120, 150, 180]
 
+# One keep-alive client for every Keepa call: reuses TCP+TLS connections
+# instead of paying a fresh handshake per /query, /search, /bestsellers, /product.
+SESSION = httpx.Client(
+    headers={
+        "User-Agent": "Mozilla/5.0",
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip",
+    },
+    limits=httpx.Limits(max_keepalive_connections=8, max_connections=32),
+)
 
-@dataclass
+KEEPA_API_BASE = "https://api.keepa.com"
+
+KEEPA_ENDPOINTS = ("query", "search", "bestsellers", "product")
+
+# Discovery requests run on a thread pool. Counter "+=" is a read-modify-write,
+# so worker-side stats updates still go through this lock.
+_STATS_LOCK = threading.Lock()
+
+
+@dataclass(slots=True)
 class Candidate:
     asin: str
     market: str
@@ -133,95 +158,195 @@ class RunStats:
     bestseller_asins: int = 0
     validated_checked: int = 0
     validated_ok: int = 0
+    cache_hits: int = 0
+
+
+RUNSTAT_FIELDS = tuple(field.name for field in fields(RunStats))
+
+
+def is_asin(token: str) -> bool:
+    """Shape check for an already upper-cased token: ``B`` + 9 ASCII alnum chars."""
+    return len(token) == 10 and token[0] == "B" and token.isascii() and token.isalnum()
 
 
 def parse_asin_token(value: Any) -> Optional[str]:
     if not isinstance(value, str):
         return None
     token = value.strip().upper()
-    return token if ASIN_RE.match(token) else None
+    return token if is_asin(token) else None
 
 
 def extract_asins(obj: Any) -> List[str]:
-    found: List[str] = []
+    # Common Keepa shape: a flat list of ASIN strings (asinList, bestSellersList).
+    if isinstance(obj, list) and all(isinstance(val, str) for val in obj):
+        return [
+            token
+            for token in (val.strip().upper() for val in obj)
+            if len(token) == 10
+            and token[0] == "B"
+            and token.isascii()
+            and token.isalnum()
+        ]
 
-    def _walk(node: Any) -> None:
+    found: List[str] = []
+    stack: Deque[Any] = deque([obj])
+    while stack:
+        node = stack.pop()
+        # Children are pushed reversed so they pop in document order.
         if isinstance(node, dict):
-            for val in node.values():
-                _walk(val)
-            return
-        if isinstance(node, (list, tuple, set)):
-            for val in node:
-                _walk(val)
-            return
-        asin = parse_asin_token(node)
-        if asin:
-            found.append(asin)
-
-    _walk(obj)
+            stack.extend(reversed(node.values()))
+        elif isinstance(node, (list, tuple)):
+            stack.extend(reversed(node))
+        elif isinstance(node, set):
+            stack.extend(node)
+        elif isinstance(node, str):
+            token = node.strip().upper()
+            if is_asin(token):
+                found.append(token)
     return found
 
 
 def dedupe_preserve_order(values: Iterable[str]) -> List[str]:
-    seen: Set[str] = set()
-    ordered: List[str] = []
-    for value in values:
-        if value in seen:
-            continue
-        seen.add(value)
-        ordered.append(value)
-    return ordered
+    # dict preserves insertion order, so this dedupes in one C-level pass.
+    return list(dict.fromkeys(values))
 
 
-def http_get_json(url: str, timeout: int) -> Dict[str, Any]:
-    import gzip
+def http_get_json(
+    url: str, timeout: int, session: httpx.Client = SESSION
+) -> Dict[str, Any]:
+    resp = session.get(url, timeout=timeout)
+    resp.raise_for_status()
+    # httpx decodes Content-Encoding: gzip incrementally while reading the body.
+    return json_loads(resp.content)
+
+
+class RateLimiter:
+    """Spaces request starts at least ``1 / rps`` apart across all threads.
+
+    Unlike a fixed sleep after every call, time already spent waiting on a slow
+    response counts towards the gap, so callers only wait for what is left.
+    """
+
+    def __init__(self, rps: float) -> None:
+        self.interval = 1.0 / rps
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class PayloadCache:
+    """Gzipped Keepa payloads on disk, reused while younger than ``ttl_seconds``."""
+
+    def __init__(self, cache_dir: Path, ttl_seconds: float) -> None:
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(endpoint: str, url_prefix: str, params: Dict[str, Any]) -> str:
+        # The prefix is "...?key=<api key>&domain=<id>"; keep only the domain part
+        # so the cache survives key rotation and never stores the key.
+        scope = url_prefix.partition("&")[2]
+        raw = f"{endpoint}|{scope}|{sorted(params.items())}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json.gz"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if path.stat().st_mtime < time.time() - self.ttl_seconds:
+                return None
+            with gzip.open(path, "rb") as fh:
+                return json_loads(fh.read())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        path = self._path(key)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with gzip.open(tmp, "wb", compresslevel=1) as fh:
+                fh.write(json_dumps(payload))
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+
+def build_url_prefixes(api_key: str, domain_id: int) -> Dict[str, str]:
+    """Per-endpoint URL prefixes with key and domain already encoded."""
+    key = quote_plus(api_key)
+    return {
+        endpoint: f"{KEEPA_API_BASE}/{endpoint}/?key={key}&domain={domain_id}"
+        for endpoint in KEEPA_ENDPOINTS
+    }
 
-    req = Request(
-        url,
-        headers={
-            "User-Agent": "Mozilla/5.0",
-            "Accept": "application/json",
-            "Accept-Encoding": "gzip",
-        },
+
+def encode_params(params: Dict[str, Any]) -> str:
+    """Query string for Keepa params; ints skip quoting, ',' and ':' stay literal.
+
+    Both characters are valid in a query component, which keeps JSON selections
+    and comma-separated ASIN lists short.
+    """
+    return "&".join(
+        (
+            f"{key}={value}"
+            if type(value) is int
+            else f"{key}={quote_plus(str(value), safe=',:')}"
+        )
+        for key, value in params.items()
     )
-    with urlopen(req, timeout=timeout) as resp:
-        raw = resp.read()
-    if raw[:2] == b"\x1f\x8b":
-        raw = gzip.decompress(raw)
-    return json.loads(raw.decode("utf-8", errors="ignore"))
 
 
 def keepa_call(
     endpoint: str,
-    api_key: str,
-    domain_id: int,
+    url_prefixes: Dict[str, str],
     timeout: int,
-    stats: RunStats,
+    stats: Counter[str],
+    session: httpx.Client = SESSION,
+    cache: Optional[PayloadCache] = None,
+    limiter: Optional[RateLimiter] = None,
     **params: Any,
 ) -> Dict[str, Any]:
-    query_parts = [f"key={quote_plus(api_key)}", f"domain={domain_id}"]
-    for key, value in params.items():
-        query_parts.append(f"{quote_plus(str(key))}={quote_plus(str(value))}")
-
-    url = f"https://api.keepa.com/{endpoint}/?{'&'.join(query_parts)}"
-
-    stats.requests_total += 1
-    if endpoint == "query":
-        stats.requests_query += 1
-    elif endpoint == "search":
-        stats.requests_search += 1
-    elif endpoint == "bestsellers":
-        stats.requests_bestsellers += 1
-    elif endpoint == "product":
-        stats.requests_product += 1
+    cache_key = ""
+    if cache is not None:
+        cache_key = cache.make_key(endpoint, url_prefixes[endpoint], params)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            with _STATS_LOCK:
+                stats["cache_hits"] += 1
+            return cached
+
+    url = url_prefixes[endpoint]
+    if params:
+        url = f"{url}&{encode_params(params)}"
+
+    if limiter is not None:
+        limiter.acquire()
+
+    with _STATS_LOCK:
+        stats["requests_total"] += 1
+        stats[f"requests_{endpoint}"] += 1
 
     try:
-        payload = http_get_json(url, timeout=timeout)
+        payload = http_get_json(url, timeout=timeout, session=session)
     except Exception:
-        stats.request_errors += 1
+        with _STATS_LOCK:
+            stats["request_errors"] += 1
         return {}
 
-    stats.tokens_consumed_total += int(payload.get("tokensConsumed", 0) or 0)
+    with _STATS_LOCK:
+        stats["tokens_consumed_total"] += int(payload.get("tokensConsumed", 0) or 0)
+    if cache is not None and payload:
+        cache.put(cache_key, payload)
     return payload
 
 
@@ -266,8 +391,41 @@ def add_candidates(
     return added
 
 
+def add_candidates_fast(
+    pool: Dict[str, Candidate],
+    asins: Iterable[str],
+    market: str,
+    domain_id: int,
+    source: str,
+    hint: str,
+    score: int,
+) -> int:
+    """Like add_candidates, for ASINs already canonicalised by extract_asins."""
+    added = 0
+    for asin in asins:
+        existing = pool.get(asin)
+        if existing is None:
+            pool[asin] = Candidate(
+                asin=asin,
+                market=market,
+                domain_id=domain_id,
+                source=source,
+                hint=hint,
+                score=score,
+            )
+            added += 1
+        elif score > existing.score:
+            existing.market = market
+            existing.domain_id = domain_id
+            existing.source = source
+            existing.hint = hint
+            existing.score = score
+
+    return added
+
+
 def discover_from_product_finder(
-    api_key: str,
+    url_prefixes: Dict[str, str],
     market: str,
     market_cfg: Dict[str, Any],
     finder_pages: int,
@@ -275,54 +433,84 @@ def discover_from_product_finder(
     min_price: float,
     max_price: float,
     timeout: int,
-    pause_seconds: float,
-    stats: RunStats,
+    limiter: Optional[RateLimiter],
+    stats: Counter[str],
     pool: Dict[str, Candidate],
+    executor: ThreadPoolExecutor,
+    min_new_ratio: float = 0.0,
+    early_stops: Optional[Dict[str, Dict[str, Any]]] = None,
+    cache: Optional[PayloadCache] = None,
 ) -> int:
     domain_id = int(market_cfg["domain_id"])
     terms = list(market_cfg["finder_terms"])
+    # Snapshot rather than the live pool: workers must not race the merge loop,
+    # and the stop decision has to be reproducible.
+    known = frozenset(pool)
+    # Bind per-market invariants once instead of re-passing them per call.
+    query = partial(
+        keepa_call,
+        "query",
+        url_prefixes,
+        timeout,
+        stats,
+        cache=cache,
+        limiter=limiter,
+    )
+    add = partial(
+        add_candidates_fast,
+        pool,
+        market=market,
+        domain_id=domain_id,
+        source="query",
+        score=3,
+    )
 
-    before = len(pool)
-    for term in terms:
+    def _fetch_term(
+        term: str,
+    ) -> Tuple[List[Tuple[int, List[str]]], Optional[Dict[str, Any]]]:
+        # Pages of one term stay sequential (an empty page ends the term);
+        # different terms run concurrently on the executor.
+        base_selection: Dict[str, Any] = {
+            "title": term,
+            "title_flag": 0,
+            "page": 0,
+            "perPage": max(10, finder_per_page),
+        }
+        if min_price > 0:
+            base_selection["current_NEW_gte"] = int(min_price * 100)
+        if max_price > 0:
+            base_selection["current_NEW_lte"] = int(max_price * 100)
+
+        pages: List[Tuple[int, List[str]]] = []
+        seen: Set[str] = set()
         for page in range(max(1, finder_pages)):
-            selection: Dict[str, Any] = {
-                "title": term,
-                "title_flag": 0,
-                "page": page,
-                "perPage": max(10, finder_per_page),
-            }
-            if min_price > 0:
-                selection["current_NEW_gte"] = int(min_price * 100)
-            if max_price > 0:
-                selection["current_NEW_lte"] = int(max_price * 100)
-
-            payload = keepa_call(
-                endpoint="query",
-                api_key=api_key,
-                domain_id=domain_id,
-                timeout=timeout,
-                stats=stats,
-                selection=json.dumps(selection, separators=(",", ":")),
-            )
+            base_selection["page"] = page
+            payload = query(selection=json_dumps(base_selection).decode("utf-8"))
             asin_list = payload.get("asinList") if isinstance(payload, dict) else None
             asins = dedupe_preserve_order(extract_asins(asin_list or []))
 
             if not asins:
                 break
 
-            stats.finder_asins += len(asins)
-            add_candidates(
-                pool=pool,
-                asins=asins,
-                market=market,
-                domain_id=domain_id,
-                source="query",
-                hint=f"{term}#p{page}",
-                score=3,
-            )
+            pages.append((page, asins))
 
-            if pause_seconds > 0:
-                time.sleep(pause_seconds)
+            # Later finder pages mostly repeat earlier hits; stop paging a term
+            # once a page contributes almost nothing new.
+            fresh = sum(1 for asin in asins if asin not in seen and asin not in known)
+            seen.update(asins)
+            new_ratio = fresh / len(asins)
+            if page >= 2 and new_ratio < min_new_ratio:
+                return pages, {"page": page, "new_ratio": round(new_ratio, 3)}
+        return pages, None
+
+    before = len(pool)
+    # executor.map yields in submission order, so the pool stays deterministic.
+    for term, (pages, early_stop) in zip(terms, executor.map(_fetch_term, terms)):
+        if early_stop is not None and early_stops is not None:
+            early_stops[term] = early_stop
+        for page, asins in pages:
+            stats["finder_asins"] += len(asins)
+            add(asins, hint=f"{term}#p{page}")
 
     return len(pool) - before
 
@@ -352,87 +540,106 @@ def parse_category_ids(payload: Dict[str, Any]) -> List[int]:
             if value > 0:
                 ids.append(value)
 
-    return dedupe_preserve_order(ids)
+    return list(dict.fromkeys(ids))
 
 
-def discover_categories(
-    api_key: str,
-    market_cfg: Dict[str, Any],
-    timeout: int,
-    stats: RunStats,
-) -> List[int]:
-    domain_id = int(market_cfg["domain_id"])
-    terms = list(market_cfg["category_terms"])
-
-    found_ids: List[int] = []
-    for term in terms:
-        payload = keepa_call(
-            endpoint="search",
-            api_key=api_key,
-            domain_id=domain_id,
-            timeout=timeout,
-            stats=stats,
-            type="category",
-            term=term,
-        )
-        found_ids.extend(parse_category_ids(payload))
-
-    return dedupe_preserve_order(found_ids)
-
-
-def discover_from_bestsellers(
-    api_key: str,
+def discover_from_categories(
+    url_prefixes: Dict[str, str],
     market: str,
     market_cfg: Dict[str, Any],
-    category_ids: List[int],
     bestseller_ranges: List[int],
     max_categories: int,
     timeout: int,
-    pause_seconds: float,
-    stats: RunStats,
+    limiter: Optional[RateLimiter],
+    stats: Counter[str],
     pool: Dict[str, Candidate],
-) -> int:
+    executor: ThreadPoolExecutor,
+    cache: Optional[PayloadCache] = None,
+) -> Tuple[List[int], int]:
+    """Category search and bestseller lookups as one pipeline.
+
+    All /search calls are submitted up front. As soon as a term's categories are
+    known, their /bestsellers jobs are queued behind the remaining searches
+    instead of waiting for every search to finish. Search results are consumed
+    in term order, so the categories picked under ``max_categories`` match a
+    sequential run.
+
+    Returns all discovered category IDs and the number of ASINs added to the pool.
+    """
     domain_id = int(market_cfg["domain_id"])
-    before = len(pool)
+    terms = list(market_cfg["category_terms"])
+    category_limit = max(1, max_categories)
+    search = partial(
+        keepa_call,
+        "search",
+        url_prefixes,
+        timeout,
+        stats,
+        cache=cache,
+        limiter=limiter,
+    )
+    bestsellers = partial(
+        keepa_call,
+        "bestsellers",
+        url_prefixes,
+        timeout,
+        stats,
+        cache=cache,
+        limiter=limiter,
+    )
+    add = partial(
+        add_candidates_fast,
+        pool,
+        market=market,
+        domain_id=domain_id,
+        source="bestsellers",
+        score=2,
+    )
 
-    for category_id in category_ids[: max(1, max_categories)]:
-        for range_offset in bestseller_ranges:
-            payload = keepa_call(
-                endpoint="bestsellers",
-                api_key=api_key,
-                domain_id=domain_id,
-                timeout=timeout,
-                stats=stats,
-                category=category_id,
-                range=max(0, int(range_offset)),
-            )
+    def _search(term: str) -> List[int]:
+        return parse_category_ids(search(type="category", term=term))
 
-            asins = dedupe_preserve_order(
-                extract_asins(
-                    payload.get("bestSellersList")
-                    if isinstance(payload, dict)
-                    else payload
-                )
+    def _fetch(category_id: int, range_value: int) -> List[str]:
+        payload = bestsellers(category=category_id, range=range_value)
+        return dedupe_preserve_order(
+            extract_asins(
+                payload.get("bestSellersList") if isinstance(payload, dict) else payload
             )
+        )
 
-            if not asins:
+    search_futures = [executor.submit(_search, term) for term in terms]
+
+    category_ids: List[int] = []
+    seen_ids: Set[int] = set()
+    jobs: List[Tuple[int, int, Future[List[str]]]] = []
+    for future in search_futures:
+        for category_id in future.result():
+            if category_id in seen_ids:
+                continue
+            seen_ids.add(category_id)
+            category_ids.append(category_id)
+            if len(category_ids) > category_limit:
                 continue
+            for range_offset in bestseller_ranges:
+                range_value = max(0, int(range_offset))
+                jobs.append(
+                    (
+                        category_id,
+                        range_offset,
+                        executor.submit(_fetch, category_id, range_value),
+                    )
+                )
 
-            stats.bestseller_asins += len(asins)
-            add_candidates(
-                pool=pool,
-                asins=asins,
-                market=market,
-                domain_id=domain_id,
-                source="bestsellers",
-                hint=f"cat={category_id},range={range_offset}",
-                score=2,
-            )
+    before = len(pool)
+    for category_id, range_offset, job in jobs:
+        asins = job.result()
+        if not asins:
+            continue
 
-            if pause_seconds > 0:
-                time.sleep(pause_seconds)
+        stats["bestseller_asins"] += len(asins)
+        add(asins, hint=f"cat={category_id},range={range_offset}")
 
-    return len(pool) - before
+    return category_ids, len(pool) - before
 
 
 def parse_current_price(current: Any) -> Optional[float]:
@@ -448,38 +655,41 @@ def parse_current_price(current: Any) -> Optional[float]:
 
 
 def validate_asins(
-    api_key: str,
-    domain_id: int,
+    url_prefixes: Dict[str, str],
     asins: List[str],
     validate_count: int,
     validate_batch_size: int,
     min_price: float,
     timeout: int,
-    pause_seconds: float,
-    stats: RunStats,
+    limiter: Optional[RateLimiter],
+    stats: Counter[str],
+    workers: int = 4,
+    cache: Optional[PayloadCache] = None,
 ) -> Set[str]:
     if validate_count <= 0 or not asins:
         return set()
 
     target = asins[: max(1, validate_count)]
     batch_size = max(1, min(100, validate_batch_size))
-    valid: Set[str] = set()
+    batches = [target[i : i + batch_size] for i in range(0, len(target), batch_size)]
+    fetch_products = partial(
+        keepa_call,
+        "product",
+        url_prefixes,
+        timeout,
+        stats,
+        cache=cache,
+        limiter=limiter,
+    )
 
-    for i in range(0, len(target), batch_size):
-        batch = target[i : i + batch_size]
-        payload = keepa_call(
-            endpoint="product",
-            api_key=api_key,
-            domain_id=domain_id,
-            timeout=timeout,
-            stats=stats,
-            asin=",".join(batch),
-        )
+    def _validate_batch(batch: List[str]) -> Tuple[int, Set[str]]:
+        payload = fetch_products(asin=",".join(batch))
 
         products = payload.get("products") if isinstance(payload, dict) else None
         if not isinstance(products, list):
-            continue
+            return 0, set()
 
+        batch_valid: Set[str] = set()
         for product in products:
             if not isinstance(product, dict):
                 continue
@@ -496,14 +706,20 @@ def validate_asins(
             if price is None or price < min_price:
                 continue
 
-            valid.add(asin)
+            batch_valid.add(asin)
 
-        stats.validated_checked += len(batch)
-        stats.validated_ok = len(valid)
+        return len(batch), batch_valid
 
-        if pause_seconds > 0:
-            time.sleep(pause_seconds)
+    # Tokens are charged per ASIN, so concurrent batches only cut latency.
+    checked = 0
+    valid: Set[str] = set()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for batch_checked, batch_valid in executor.map(_validate_batch, batches):
+            checked += batch_checked
+            valid |= batch_valid
 
+    stats["validated_checked"] += checked
+    stats["validated_ok"] = len(valid)
     return valid
 
 
@@ -526,10 +742,9 @@ def write_outputs(
         "records": [asdict(record) for record in selected_records],
     }
 
-    output_json.write_text(
-        json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8"
-    )
-    output_txt.write_text(",".join(selected_asins), encoding="utf-8")
+    output_json.write_bytes(json_dumps_pretty(payload))
+    # ASINs are ASCII by construction (see is_asin).
+    output_txt.write_bytes(",".join(selected_asins).encode("ascii"))
 
 
 def parse_args() -> argparse.Namespace:
@@ -542,6 +757,12 @@ def parse_args() -> argparse.Namespace:
 
     parser.add_argument("--finder-pages", type=int, default=8)
     parser.add_argument("--finder-per-page", type=int, default=500)
+    parser.add_argument(
+        "--finder-min-new-ratio",
+        type=float,
+        default=0.05,
+        help="Stop paging a finder term (after page 2) once a page has fewer new ASINs.",
+    )
     parser.add_argument("--max-categories", type=int, default=80)
     parser.add_argument("--bestseller-ranges", default="0,30,60,90,120,150,180")
 
@@ -554,10 +775,33 @@ def parse_args() -> argparse.Namespace:
         default=0,
         help="Optional: validate first N ASINs with /product endpoint (token heavy).",
     )
-    parser.add_argument("--validate-batch-size", type=int, default=40)
+    parser.add_argument(
+        "--validate-batch-size",
+        type=int,
+        default=100,
+        help="ASINs per /product call (Keepa maximum: 100).",
+    )
 
     parser.add_argument("--timeout", type=int, default=25)
-    parser.add_argument("--pause-ms", type=int, default=100)
+    parser.add_argument(
+        "--pause-ms",
+        type=int,
+        default=100,
+        help="Minimum gap between Keepa request starts, shared by all workers.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Concurrent Keepa requests during discovery.",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=".cache/keepa",
+        help="Directory for cached Keepa payloads. Empty string disables the cache.",
+    )
+    parser.add_argument("--cache-ttl-hours", type=float, default=24.0)
 
     parser.add_argument("--output-json", default="data/seed_asins_eu_qwertz.json")
     parser.add_argument("--output-txt", default="data/seed_asins_eu_qwertz.txt")
@@ -572,9 +816,11 @@ def main() -> int:
         print("ERROR: Missing --api-key and KEEPA_API_KEY.", file=sys.stderr)
         return 2
 
-    selected_markets = [
-        m.strip().upper() for m in str(args.markets).split(",") if m.strip()
-    ]
+    selected_markets = list(
+        dict.fromkeys(
+            m.strip().upper() for m in str(args.markets).split(",") if m.strip()
+        )
+    )
     invalid = [m for m in selected_markets if m not in MARKETS]
     if invalid:
         print(f"ERROR: Unsupported markets: {', '.join(invalid)}", file=sys.stderr)
@@ -592,55 +838,60 @@ def main() -> int:
     if not bestseller_ranges:
         bestseller_ranges = list(DEFAULT_BESTSELLER_RANGES)
 
-    pause_seconds = max(0.0, int(args.pause_ms) / 1000.0)
-    stats = RunStats()
+    pause_ms = max(0, int(args.pause_ms))
+    limiter = RateLimiter(rps=1000.0 / pause_ms) if pause_ms > 0 else None
+    stats: Counter[str] = Counter()
+    cache: Optional[PayloadCache] = None
+    if args.cache_dir and args.cache_ttl_hours > 0:
+        cache = PayloadCache(Path(args.cache_dir), args.cache_ttl_hours * 3600.0)
 
     pool: Dict[str, Candidate] = {}
     category_map: Dict[str, List[int]] = {}
+    finder_early_stops: Dict[str, Dict[str, Dict[str, Any]]] = {}
 
     print(f"Discovering ASINs via Keepa for markets: {', '.join(selected_markets)}")
-    for market in selected_markets:
-        cfg = MARKETS[market]
-
-        added_finder = discover_from_product_finder(
-            api_key=args.api_key,
-            market=market,
-            market_cfg=cfg,
-            finder_pages=max(1, int(args.finder_pages)),
-            finder_per_page=max(10, int(args.finder_per_page)),
-            min_price=max(0.0, float(args.min_price)),
-            max_price=max(0.0, float(args.max_price)),
-            timeout=max(5, int(args.timeout)),
-            pause_seconds=pause_seconds,
-            stats=stats,
-            pool=pool,
-        )
+    with ThreadPoolExecutor(max_workers=max(1, int(args.workers))) as executor:
+        for market in selected_markets:
+            cfg = MARKETS[market]
+            url_prefixes = build_url_prefixes(args.api_key, int(cfg["domain_id"]))
 
-        category_ids = discover_categories(
-            api_key=args.api_key,
-            market_cfg=cfg,
-            timeout=max(5, int(args.timeout)),
-            stats=stats,
-        )
-        category_map[market] = category_ids
-
-        added_best = discover_from_bestsellers(
-            api_key=args.api_key,
-            market=market,
-            market_cfg=cfg,
-            category_ids=category_ids,
-            bestseller_ranges=bestseller_ranges,
-            max_categories=max(1, int(args.max_categories)),
-            timeout=max(5, int(args.timeout)),
-            pause_seconds=pause_seconds,
-            stats=stats,
-            pool=pool,
-        )
+            added_finder = discover_from_product_finder(
+                url_prefixes=url_prefixes,
+                market=market,
+                market_cfg=cfg,
+                finder_pages=max(1, int(args.finder_pages)),
+                finder_per_page=max(10, int(args.finder_per_page)),
+                min_price=max(0.0, float(args.min_price)),
+                max_price=max(0.0, float(args.max_price)),
+                timeout=max(5, int(args.timeout)),
+                limiter=limiter,
+                stats=stats,
+                pool=pool,
+                executor=executor,
+                cache=cache,
+                min_new_ratio=max(0.0, float(args.finder_min_new_ratio)),
+                early_stops=finder_early_stops.setdefault(market, {}),
+            )
 
-        print(
-            f"  {market}: +{added_finder} from query, +{added_best} from bestsellers, "
-            f"categories={len(category_ids)}"
-        )
+            category_ids, added_best = discover_from_categories(
+                url_prefixes=url_prefixes,
+                market=market,
+                market_cfg=cfg,
+                bestseller_ranges=bestseller_ranges,
+                max_categories=max(1, int(args.max_categories)),
+                timeout=max(5, int(args.timeout)),
+                limiter=limiter,
+                stats=stats,
+                pool=pool,
+                executor=executor,
+                cache=cache,
+            )
+            category_map[market] = category_ids
+
+            print(
+                f"  {market}: +{added_finder} from query, +{added_best} from bestsellers, "
+                f"categories={len(category_ids)}"
+            )
 
     ordered_candidates = list(pool.values())
     ordered_asins = [item.asin for item in ordered_candidates]
@@ -648,15 +899,16 @@ def main() -> int:
     if args.validate_count > 0 and ordered_asins:
         primary_domain = int(MARKETS[selected_markets[0]]["domain_id"])
         valid = validate_asins(
-            api_key=args.api_key,
-            domain_id=primary_domain,
+            url_prefixes=build_url_prefixes(args.api_key, primary_domain),
             asins=ordered_asins,
             validate_count=max(1, int(args.validate_count)),
             validate_batch_size=max(1, int(args.validate_batch_size)),
             min_price=max(0.0, float(args.min_price)),
             timeout=max(5, int(args.timeout)),
-            pause_seconds=pause_seconds,
+            limiter=limiter,
             stats=stats,
+            workers=min(4, max(1, int(args.workers))),
+            cache=cache,
         )
         if valid:
             ordered_asins = [asin for asin in ordered_asins if asin in valid] + [
@@ -676,6 +928,8 @@ def main() -> int:
         "seed_limit": seed_limit,
         "finder_pages": int(args.finder_pages),
         "finder_per_page": int(args.finder_per_page),
+        "finder_min_new_ratio": float(args.finder_min_new_ratio),
+        "finder_early_stops": finder_early_stops,
         "max_categories": int(args.max_categories),
         "bestseller_ranges": bestseller_ranges,
         "min_price": float(args.min_price),
@@ -685,6 +939,8 @@ def main() -> int:
         "discovered_unique_total": len(ordered_asins),
     }
 
+    run_stats = RunStats(**{name: stats[name] for name in RUNSTAT_FIELDS})
+
     output_json = Path(args.output_json)
     output_txt = Path(args.output_txt)
     write_outputs(
@@ -692,14 +948,15 @@ def main() -> int:
         output_txt=output_txt,
         selected_asins=selected_asins,
         selected_records=selected_records,
-        stats=stats,
+        stats=run_stats,
         runtime_meta=runtime_meta,
     )
 
     print(f"Unique discovered ASINs: {len(ordered_asins)}")
     print(f"Selected ASINs: {len(selected_asins)}")
     print(
-        f"Requests: {stats.requests_total}, errors: {stats.request_errors}, tokens: {stats.tokens_consumed_total}"
+        f"Requests: {run_stats.requests_total}, errors: {run_stats.request_errors}, tokens: {run_stats.tokens_consumed_total}, "
+        f"cache hits: {run_stats.cache_hits}"
     )
     print(f"Wrote JSON: {output_json}")
     print(f"Wrote TXT : {output_txt}")
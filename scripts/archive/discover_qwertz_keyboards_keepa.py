@@ -11,29 +11,33 @@ Usage:
 
 Output:
     data/keepa_search_qwertz.csv
-    data/keepa_search_qwertz.json
+    data/keepa_search_qwertz.ndjson  (one validated record per line)
+    data/keepa_search_qwertz.json    (run metadata + ASIN list)
 """
 
 import argparse
 import asyncio
 import csv
-import json
+import functools
 import logging
+import operator
 import os
 import sys
 import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from collections import deque
 from pathlib import Path
+from types import MappingProxyType
+from typing import AsyncIterator
 
-import importlib.util
+import httpx
 
-spec = importlib.util.spec_from_file_location(
-    "keepa_client_module",
-    Path(__file__).parent.parent / "src" / "services" / "keepa_client.py",
-)
-keepa_client_module = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(keepa_client_module)
-KeepaClient = keepa_client_module.KeepaClient
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.services.keepa_client import KeepaClient
+from src.services.keepa_token_bucket import KeepaTokenBucket
+from src.utils.json_codec import json_dumps, json_dumps_pretty
 
 logging.basicConfig(
     level=logging.INFO,
@@ -112,6 +116,29 @@ SEARCH_KEYWORDS = {
 
 MAX_PAGES = 3
 
+# Shared read-only fallback for missing response sections
+_EMPTY = MappingProxyType({})
+
+# Resolved once at import: (market, domain_id, keywords) in DOMAINS order
+MARKET_PLAN = tuple(
+    (market, domain_id, tuple(SEARCH_KEYWORDS.get(market, ())))
+    for market, domain_id in DOMAINS.items()
+)
+TOTAL_KEYWORDS = sum(len(keywords) for _, _, keywords in MARKET_PLAN)
+
+# Shared keep-alive client: token checks and all KeepaClient search/product
+# requests reuse its pooled TLS connections for the whole run
+_HTTP = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_keepalive_connections=20, max_connections=50, keepalive_expiry=30
+    ),
+    timeout=10,
+)
+
+# Estimated Keepa token cost per request, charged up front by the bucket
+SEARCH_TOKEN_COST = 10
+PRODUCT_TOKEN_COST_PER_ASIN = 1
+
 stats = {
     "searches": 0,
     "asins_found": 0,
@@ -119,58 +146,107 @@ stats = {
     "validated": 0,
     "errors": 0,
     "tokens_consumed": 0,
+    "cross_market_duplicates": 0,
 }
 
 
+@functools.lru_cache(maxsize=1)
+def _env_file_values() -> dict[str, str]:
+    """KEY=value pairs of the .env file, read once per process."""
+    env_file = Path(__file__).parent.parent / ".env"
+    if not env_file.exists():
+        return {}
+    values = {}
+    for line in env_file.read_text().splitlines():
+        if "=" in line and not line.startswith("#"):
+            key, value = line.split("=", 1)
+            values.setdefault(key, value)  # first definition wins
+    return values
+
+
 def get_api_key() -> str:
     api_key = os.environ.get("KEEPA_API_KEY", "")
     if not api_key:
-        env_file = Path(__file__).parent.parent / ".env"
-        if env_file.exists():
-            for line in env_file.read_text().splitlines():
-                if line.startswith("KEEPA_API_KEY="):
-                    return line.split("=", 1)[1].strip().strip('"').strip("'")
+        value = _env_file_values().get("KEEPA_API_KEY", "")
+        return value.strip().strip('"').strip("'")
     return api_key
 
 
-async def check_token_budget(client: KeepaClient):
+async def check_token_budget(client: KeepaClient, http: httpx.AsyncClient = _HTTP):
     """Check available Keepa tokens before starting."""
     try:
-        import httpx
-
-        async with httpx.AsyncClient() as http:
-            resp = await http.get(
-                "https://api.keepa.com/token",
-                params={"key": client.api_key},
-                timeout=10,
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                tokens = data.get("tokensLeft", 0)
-                refill = data.get("refillIn", 0)
-                log.info(f"Token budget: {tokens} tokens left, refill in {refill}ms")
-                return tokens
+        resp = await http.get(
+            "https://api.keepa.com/token",
+            params={"key": client.api_key},
+            timeout=10,
+        )
+        if resp.status_code == 200:
+            data = resp.json()
+            tokens = data.get("tokensLeft", 0)
+            refill = data.get("refillIn", 0)
+            log.info(f"Token budget: {tokens} tokens left, refill in {refill}ms")
+            return data
     except Exception as e:
         log.warning(f"Could not check token budget: {e}")
     return None
 
 
+def asin_key(asin: str) -> int | str:
+    """Compact case-insensitive dedupe key for an ASIN.
+
+    ASINs are uppercase, so "b0abc..." and "B0ABC..." are the same product
+    and share a key. A 10-character alphanumeric ASIN reads as a base-36
+    number (below 2**52), an int key that is cheaper to hash and store than
+    the string; the fixed length keeps leading zeros significant. Anything
+    else is kept as the uppercased string.
+    """
+    asin = asin.upper()
+    if len(asin) == 10 and asin.isascii() and asin.isalnum():
+        return int(asin, 36)
+    return asin
+
+
+@dataclass
+class DiscoveryContext:
+    """State shared by every market task in one discovery run.
+
+    ``seen`` holds keys (see ``asin_key``) of ASINs some market has already
+    validated into a row; when it is None, each market validates its own
+    results independently.
+    """
+
+    sem: asyncio.Semaphore = field(default_factory=lambda: asyncio.Semaphore(1))
+    bucket: KeepaTokenBucket | None = None
+    seen: set[int | str] | None = None
+
+
 async def search_keyword(
-    client: KeepaClient, keyword: str, domain_id: int, page: int = 1
+    client: KeepaClient,
+    keyword: str,
+    domain_id: int,
+    page: int = 1,
+    ctx: DiscoveryContext | None = None,
 ) -> list[str]:
     """Search for products and return ASINs."""
+    ctx = ctx or DiscoveryContext()
+    bucket = ctx.bucket
+    if bucket:
+        await bucket.acquire(SEARCH_TOKEN_COST)
+    tokens_left = None
     try:
-        response = await client.search_products(
-            search_term=keyword,
-            domain_id=domain_id,
-            page=page,
-        )
+        async with ctx.sem:
+            response = await client.search_products(
+                search_term=keyword,
+                domain_id=domain_id,
+                page=page,
+            )
+        raw = response.get("raw") or _EMPTY
+        metadata = response.get("metadata") or _EMPTY
         stats["searches"] += 1
-        stats["tokens_consumed"] += response.get("metadata", {}).get(
-            "tokens_consumed", 0
-        )
+        stats["tokens_consumed"] += metadata.get("tokens_consumed", 0)
+        tokens_left = raw.get("tokensLeft")
 
-        products = response.get("raw", {}).get("products", [])
+        products = raw.get("products") or ()
         asins = [p.get("asin") for p in products if p.get("asin")]
         stats["asins_found"] += len(asins)
 
@@ -179,6 +255,58 @@ async def search_keyword(
         log.warning(f"Search failed for '{keyword}' on domain {domain_id}: {e}")
         stats["errors"] += 1
         return []
+    finally:
+        if bucket:
+            bucket.sync(tokens_left, SEARCH_TOKEN_COST)
+
+
+def _latest_prices(csv_data: list) -> tuple:
+    """Latest (amazon, new, used) prices from a Keepa ``csv`` array.
+
+    Each history is a flat ``[time, price, ...]`` list in cents with -1 for
+    "no offer", so only its final element matters.
+    """
+    histories = (*csv_data[:3], None, None, None)
+    return tuple(
+        h[-1] / 100.0 if h and len(h) >= 2 and h[-1] > 0 else None
+        for h in histories[:3]
+    )
+
+
+async def fetch_product_batch(
+    client: KeepaClient,
+    batch: list[str],
+    domain_id: int,
+    market: str,
+    ctx: DiscoveryContext,
+) -> list[dict]:
+    """Fetch one /product batch, returning its products (empty on error).
+
+    Retries are left to KeepaClient, which backs off on rate limits and
+    Keepa timeouts; each HTTP request is bounded by the client's timeout.
+    """
+    bucket = ctx.bucket
+    cost = len(batch) * PRODUCT_TOKEN_COST_PER_ASIN
+    if bucket:
+        await bucket.acquire(cost)
+    tokens_left = None
+    try:
+        async with ctx.sem:
+            response = await client.get_products(batch, domain_id)
+        raw = response.get("raw") or _EMPTY
+        metadata = response.get("metadata") or _EMPTY
+        stats["products_fetched"] += len(batch)
+        stats["tokens_consumed"] += metadata.get("tokens_consumed", 0)
+        tokens_left = raw.get("tokensLeft")
+
+        return raw.get("products") or []
+    except Exception as e:
+        log.warning(f"Batch validation error on {market}: {e!r}")
+        stats["errors"] += 1
+        return []
+    finally:
+        if bucket:
+            bucket.sync(tokens_left, cost)
 
 
 async def validate_batch(
@@ -187,22 +315,41 @@ async def validate_batch(
     domain_id: int,
     market: str,
     batch_size: int = 50,
+    ctx: DiscoveryContext | None = None,
+    target: int | None = None,
+    prefetch: int = 3,
 ) -> list[dict]:
-    """Validate ASINs via Keepa /product in batches."""
+    """Validate ASINs via Keepa /product in batches.
+
+    Up to ``prefetch`` batches are in flight at once (bounded further by the
+    shared semaphore and paced by the token bucket) and are processed in
+    their original order. Once ``target`` records are validated, the rest of
+    the current batch is left unclaimed and batches not yet sent are
+    cancelled, so no tokens are spent on surplus ASINs and other markets can
+    still validate them.
+    """
+    ctx = ctx or DiscoveryContext()
     validated = []
 
-    for i in range(0, len(asins), batch_size):
-        batch = asins[i : i + batch_size]
-
-        try:
-            response = await client.get_products(batch, domain_id)
-            stats["products_fetched"] += len(batch)
-            stats["tokens_consumed"] += response.get("metadata", {}).get(
-                "tokens_consumed", 0
-            )
-
-            products = response.get("raw", {}).get("products", [])
+    batches = (asins[i : i + batch_size] for i in range(0, len(asins), batch_size))
+    in_flight: deque[asyncio.Task] = deque()
+    try:
+        while True:
+            while len(in_flight) < max(1, prefetch):
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                in_flight.append(
+                    asyncio.create_task(
+                        fetch_product_batch(client, batch, domain_id, market, ctx)
+                    )
+                )
+            if not in_flight:
+                break
 
+            products = await in_flight.popleft()
+            # One timestamp per batch: rows of a batch come from one response
+            validated_at = datetime.now(timezone.utc).isoformat()
             for product in products:
                 asin = product.get("asin", "")
                 title = product.get("title", "")
@@ -213,25 +360,21 @@ async def validate_batch(
                 csv_data = product.get("csv") or []
                 ean_list = product.get("eanList") or []
 
-                # Extract prices
-                def get_price(idx):
-                    if (
-                        len(csv_data) > idx
-                        and csv_data[idx]
-                        and len(csv_data[idx]) >= 2
-                        and csv_data[idx][-1] > 0
-                    ):
-                        return csv_data[idx][-1] / 100.0
-                    return None
-
-                new_price = get_price(1)
-                used_price = get_price(2)
-                amazon_price = get_price(0)
+                amazon_price, new_price, used_price = _latest_prices(csv_data)
 
                 # At least some price must exist
                 if new_price is None and used_price is None and amazon_price is None:
                     continue
 
+                # Claim the ASIN only once it yields a row, so an ASIN this
+                # market rejects (or never sends) stays open to other markets
+                if ctx.seen is not None:
+                    key = asin_key(asin)
+                    if key in ctx.seen:
+                        stats["cross_market_duplicates"] += 1
+                        continue
+                    ctx.seen.add(key)
+
                 validated.append(
                     {
                         "asin": asin,
@@ -243,116 +386,238 @@ async def validate_batch(
                         "brand": brand,
                         "ean": ean_list[0] if ean_list else "",
                         "source": "keepa_search",
-                        "validated_at": datetime.now(timezone.utc).isoformat(),
+                        "validated_at": validated_at,
                     }
                 )
                 stats["validated"] += 1
+                if target is not None and len(validated) >= target:
+                    break
 
-        except Exception as e:
-            log.warning(f"Batch validation error on {market}: {e}")
-            stats["errors"] += 1
-
-        await asyncio.sleep(2)
+            if target is not None and len(validated) >= target:
+                break
+    finally:
+        for task in in_flight:
+            task.cancel()
 
     return validated
 
 
+async def search_keyword_pages(
+    client: KeepaClient,
+    market: str,
+    keyword: str,
+    domain_id: int,
+    ctx: DiscoveryContext,
+) -> list[list[str]]:
+    """Fetch result pages for one keyword in order, stopping at the first empty one."""
+    log.info(f"  [{market}] Searching: '{keyword}'")
+    pages = []
+    for page in range(1, MAX_PAGES + 1):
+        asins = await search_keyword(client, keyword, domain_id, page, ctx=ctx)
+        pages.append(asins)
+        if len(asins) == 0:
+            break
+    return pages
+
+
 async def discover_market(
     client: KeepaClient,
     market: str,
     domain_id: int,
     max_results: int = 100,
+    ctx: DiscoveryContext | None = None,
+    keywords: tuple[str, ...] | None = None,
+    after: asyncio.Future | None = None,
 ) -> list[dict]:
-    """Discover QWERTZ keyboards for a single market."""
+    """Discover QWERTZ keyboards for a single market.
+
+    Searching starts right away; validation (and with it claiming ASINs in
+    ``ctx.seen``) waits until ``after``, the previous market, is done.
+    """
+    ctx = ctx or DiscoveryContext()
     log.info(f"\nDiscovering {market} (domain={domain_id})")
 
-    keywords = SEARCH_KEYWORDS.get(market, [])
+    if keywords is None:
+        keywords = tuple(SEARCH_KEYWORDS.get(market, ()))
     all_asins = set()
 
-    for keyword in keywords:
-        log.info(f"  Searching: '{keyword}'")
-
-        for page in range(1, MAX_PAGES + 1):
-            asins = await search_keyword(client, keyword, domain_id, page)
-            new_count = len(asins - all_asins) if isinstance(asins, set) else len(
-                [a for a in asins if a not in all_asins]
-            )
-            all_asins.update(asins)
-
-            log.info(f"    Page {page}: +{new_count} new (total: {len(all_asins)})")
+    # Keywords run concurrently; pages within a keyword stay sequential so an
+    # empty page still ends that keyword early. Merging in keyword order keeps
+    # the log and the resulting ASIN set independent of completion order.
+    per_keyword = await asyncio.gather(
+        *(
+            search_keyword_pages(client, market, keyword, domain_id, ctx)
+            for keyword in keywords
+        )
+    )
 
-            if len(asins) == 0:
-                break
+    for keyword, pages in zip(keywords, per_keyword):
+        for page, asins in enumerate(pages, start=1):
+            new_asins = set(asins) - all_asins
+            new_count = len(new_asins)
+            all_asins |= new_asins
 
-            await asyncio.sleep(2)
+            log.info(
+                f"    [{market}] '{keyword}' page {page}: +{new_count} new "
+                f"(total: {len(all_asins)})"
+            )
 
+    if after is not None:
+        await asyncio.wait([after])
     log.info(f"  {len(all_asins)} unique ASINs found, validating...")
 
     asin_list = list(all_asins)
+    if ctx.seen is not None:
+        # Skip ASINs another market already validated; fetching them again
+        # would spend /product tokens on a duplicate row. validate_batch
+        # claims each ASIN only once it actually yields a row.
+        asin_list = [a for a in asin_list if asin_key(a) not in ctx.seen]
+        stats["cross_market_duplicates"] += len(all_asins) - len(asin_list)
     if len(asin_list) > max_results * 3:
         asin_list = asin_list[: max_results * 3]
 
-    validated = await validate_batch(client, asin_list, domain_id, market)
+    validated = await validate_batch(
+        client, asin_list, domain_id, market, ctx=ctx, target=max_results
+    )
 
     log.info(f"  {len(validated)} validated for {market}")
     return validated[:max_results]
 
 
-async def discover_all(client: KeepaClient, max_per_market: int = 100) -> list[dict]:
-    """Discover across all markets."""
-    results = []
-
-    for market, domain_id in DOMAINS.items():
-        validated = await discover_market(client, market, domain_id, max_per_market)
-        results.extend(validated)
-        await asyncio.sleep(5)
-
-    return results
-
-
-def write_output(results: list[dict], output_path: Path):
-    """Write results to CSV and JSON."""
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    fieldnames = [
-        "asin",
-        "domain_id",
-        "market",
-        "title",
-        "new_price",
-        "used_price",
-        "brand",
-        "ean",
-        "source",
-        "validated_at",
-    ]
-
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results)
-
-    log.info(f"Saved {len(results)} records to {output_path}")
-
-    # JSON output
-    json_path = output_path.with_suffix(".json")
-    by_market = {}
-    for r in results:
-        by_market.setdefault(r["market"], []).append(r)
-
-    payload = {
-        "_meta": {
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "total": len(results),
-            "markets": list(DOMAINS.keys()),
-            "by_market_count": {m: len(v) for m, v in by_market.items()},
-            "stats": stats,
-        },
-        "all_asins": list(dict.fromkeys(r["asin"] for r in results)),
-        "by_market": by_market,
-    }
-    json_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False))
-    log.info(f"Saved JSON to {json_path}")
+async def discover_all(
+    client: KeepaClient,
+    max_per_market: int = 100,
+    concurrency: int = 5,
+    bucket: KeepaTokenBucket | None = None,
+    cross_market_dedupe: bool = True,
+) -> AsyncIterator[tuple[str, list[dict]]]:
+    """Discover across all markets concurrently, yielding ``(market, records)``.
+
+    Markets are independent, so they run side by side; one shared semaphore
+    caps the number of Keepa requests in flight across all of them, and the
+    optional token bucket paces them against the key's token budget. Results
+    are yielded in DOMAINS order as soon as each market is done, so callers
+    can write them out without holding the whole run in memory.
+
+    With cross-market dedupe, markets validate one after another in DOMAINS
+    order (their searches still overlap), so an ASIN several markets find
+    always goes to the same, earliest market that validates it.
+    """
+    ctx = DiscoveryContext(
+        sem=asyncio.Semaphore(max(1, concurrency)),
+        bucket=bucket,
+        seen=set() if cross_market_dedupe else None,
+    )
+    tasks: list[asyncio.Task] = []
+    for market, domain_id, keywords in MARKET_PLAN:
+        after = tasks[-1] if tasks and cross_market_dedupe else None
+        tasks.append(
+            asyncio.create_task(
+                discover_market(
+                    client,
+                    market,
+                    domain_id,
+                    max_per_market,
+                    ctx=ctx,
+                    keywords=keywords,
+                    after=after,
+                )
+            )
+        )
+    try:
+        for (market, _, _), task in zip(MARKET_PLAN, tasks):
+            yield market, await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+CSV_FIELDS = [
+    "asin",
+    "domain_id",
+    "market",
+    "title",
+    "new_price",
+    "used_price",
+    "brand",
+    "ean",
+    "source",
+    "validated_at",
+]
+_csv_row = operator.itemgetter(*CSV_FIELDS)
+
+
+class ResultWriter:
+    """Stream validated records to CSV and NDJSON as each market finishes.
+
+    Only ASIN strings and per-market counts are kept in memory for the JSON
+    summary written at the end.
+    """
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self.ndjson_path = output_path.with_suffix(".ndjson")
+        self.json_path = output_path.with_suffix(".json")
+        self.by_market_count: dict[str, int] = {}
+        self.all_asins: dict[str, None] = {}
+
+    def __enter__(self) -> "ResultWriter":
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._csv_file = open(self.output_path, "w", newline="", encoding="utf-8")
+        self._ndjson_file = open(self.ndjson_path, "wb")
+        self._writer = csv.writer(self._csv_file)
+        self._writer.writerow(CSV_FIELDS)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._csv_file.close()
+        self._ndjson_file.close()
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_market_count.values())
+
+    def write(self, market: str, records: list[dict]) -> None:
+        self._writer.writerows(map(_csv_row, records))
+        self._ndjson_file.write(b"".join(json_dumps(r) + b"\n" for r in records))
+        self.by_market_count[market] = len(records)
+        self.all_asins.update(dict.fromkeys(r["asin"] for r in records))
+
+    def write_summary(self) -> None:
+        log.info(f"Saved {self.total} records to {self.output_path}")
+        log.info(f"Saved records to {self.ndjson_path}")
+
+        payload = {
+            "_meta": {
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "total": self.total,
+                "markets": list(DOMAINS.keys()),
+                "by_market_count": self.by_market_count,
+                "stats": stats,
+            },
+            "all_asins": list(self.all_asins),
+        }
+        self.json_path.write_bytes(json_dumps_pretty(payload))
+        log.info(f"Saved JSON to {self.json_path}")
+
+
+async def run_pipeline(
+    client: KeepaClient,
+    max_per_market: int,
+    concurrency: int,
+    output: ResultWriter,
+    cross_market_dedupe: bool = True,
+) -> None:
+    """Token check, streamed discovery and final token check on one event loop."""
+    try:
+        bucket = KeepaTokenBucket.from_token_status(await check_token_budget(client))
+        async for market, records in discover_all(
+            client, max_per_market, concurrency, bucket, cross_market_dedupe
+        ):
+            output.write(market, records)
+        await check_token_budget(client)
+    finally:
+        await _HTTP.aclose()
 
 
 def main():
@@ -360,6 +625,19 @@ def main():
         description="Discover QWERTZ keyboard ASINs via Keepa /search API"
     )
     parser.add_argument("--max-per-market", type=int, default=100)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=5,
+        help="Max Keepa requests in flight across all markets",
+    )
+    parser.add_argument(
+        "--cross-market-dedupe",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Give each ASIN to one market only, the first in DOMAINS order "
+        "(DE, UK, FR, IT, ES) that validates it",
+    )
     parser.add_argument("--output", type=str, default="data/keepa_search_qwertz.csv")
     args = parser.parse_args()
 
@@ -368,35 +646,37 @@ def main():
         log.error("KEEPA_API_KEY not set. Set in .env or environment.")
         sys.exit(1)
 
-    client = KeepaClient(api_key=api_key)
+    client = KeepaClient(api_key=api_key, http_client=_HTTP)
 
     log.info("QWERTZ Keyboard Discovery via Keepa")
     log.info(f"  Markets: {', '.join(DOMAINS.keys())}")
-    log.info(
-        f"  Keywords: {sum(len(kws) for kws in SEARCH_KEYWORDS.values())} total"
-    )
+    log.info(f"  Keywords: {TOTAL_KEYWORDS} total")
     log.info(f"  Pages/keyword: {MAX_PAGES}")
     log.info(f"  Max/market: {args.max_per_market}")
+    log.info(f"  Concurrency: {args.concurrency}")
 
     start = time.time()
 
-    # Check tokens
-    asyncio.run(check_token_budget(client))
-
-    results = asyncio.run(discover_all(client, args.max_per_market))
+    output_path = Path(__file__).parent.parent / args.output
+    with ResultWriter(output_path) as output:
+        asyncio.run(
+            run_pipeline(
+                client,
+                args.max_per_market,
+                args.concurrency,
+                output,
+                args.cross_market_dedupe,
+            )
+        )
 
     elapsed = time.time() - start
 
-    output_path = Path(__file__).parent.parent / args.output
-    write_output(results, output_path)
+    output.write_summary()
 
     log.info(f"\nDiscovery complete in {elapsed / 60:.1f} min")
-    log.info(f"  Total validated: {len(results)}")
+    log.info(f"  Total validated: {output.total}")
     log.info(f"  Stats: {stats}")
 
-    # Check tokens after
-    asyncio.run(check_token_budget(client))
-
 
 if __name__ == "__main__":
     main()
@@ -11,26 +11,35 @@ Features:
 - 3 pages pagination per keyword
 - playwright-stealth for anti-detection
 - User-Agent rotation (5+ current Chrome UAs)
-- Random delays (5-12s between requests)
-- Session rotation (new browser context every 20 requests)
+- Small random jitter (0.3-1.5s) to avoid synchronized bursts
+- Session rotation (fresh browser context per keyword)
 - Viewport variation
-- Rate limiting: max 50 requests/hour per domain
+- Rate limiting: per-domain token bucket, max 50 requests/hour per domain
 - Captcha handling: 5min pause + new context
+- Conditional requests (ETag / If-Modified-Since) for search pages on re-runs
 
-Output: data/amazon_asins_raw.csv + data/amazon_asins_raw.json
+Output: data/amazon_asins_raw.csv + .jsonl (appended per row while scraping)
+        + data/amazon_asins_raw.json (summary, written at the end)
 """
 
 import asyncio
 import csv
-import json
 import random
+import sqlite3
+import sys
 import time
 import argparse
 from pathlib import Path
 from datetime import datetime, timezone
 from collections import defaultdict
+from itertools import zip_longest
+from urllib.parse import quote_plus
 
-from playwright.async_api import async_playwright
+from playwright.async_api import Error as PlaywrightError, async_playwright
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.utils.json_codec import json_dumps, json_dumps_pretty
 
 try:
     from playwright_stealth import Stealth
@@ -154,33 +163,123 @@ MAX_PAGES = 3
 
 # Rate limiting
 MAX_REQUESTS_PER_HOUR = 50
-REQUEST_DELAY_MIN = 5.0
-REQUEST_DELAY_MAX = 12.0
-CONTEXT_ROTATION_INTERVAL = 20  # New browser context every N requests
+# The token bucket enforces the rate cap; jitter only de-synchronizes workers
+REQUEST_DELAY_MIN = 0.3
+REQUEST_DELAY_MAX = 1.5
 CAPTCHA_PAUSE_SECONDS = 300  # 5 minutes
+GOTO_ATTEMPTS = 3  # Navigation retries on timeouts / net::ERR_* failures
+
+# Amazon's robot check is a form posting to /errors/validateCaptcha
+CAPTCHA_SELECTOR = "form[action*='validateCaptcha'], #captchacharacters"
+
+# Only the HTML carries the product tiles; skip everything heavier
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "stylesheet", "font", "media"})
+DEFAULT_CONCURRENCY = 3  # Keywords scraped in parallel, one browser each
+
+# Trim Chromium to what a headless SERP scrape needs: no GPU/WebGL/raster
+# work, no background traffic. --no-zygote requires --no-sandbox, and
+# --disable-dev-shm-usage is required in Docker, whose /dev/shm is only 64MB.
+CHROMIUM_ARGS = [
+    "--no-zygote",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-accelerated-2d-canvas",
+    "--disable-mipmap-generation",
+    "--disable-partial-raster",
+    "--disable-webgl",
+    "--no-first-run",
+    "--disable-background-networking",
+    "--disable-features=TranslateUI,BlinkGenPropertyTrees",
+]
+
+# Price/rating normalization in one pass: drop currency and NBSP, "," -> "."
+_PRICE_TRANS = str.maketrans({"€": None, "£": None, "\xa0": None, ",": "."})
+_DECIMAL_COMMA_TRANS = str.maketrans(",", ".")
+
+# Cached search pages older than this are fetched unconditionally
+PAGE_CACHE_MAX_AGE_SECONDS = 6 * 3600
+
+CSV_FIELDS = [
+    "asin",
+    "title",
+    "price",
+    "rating",
+    "market",
+    "keyword",
+    "page",
+    "source",
+    "scraped_at",
+]
+
+
+class DomainTokenBucket:
+    """Token bucket for one domain: bursts up to capacity, refills evenly."""
+
+    def __init__(self, domain: str, capacity: int, per_seconds: float = 3600):
+        self.domain = domain
+        self.capacity = capacity
+        self.rate = capacity / per_seconds
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Take one token, sleeping only while this domain's bucket is empty.
+
+        The lock is held across the sleep so waiters are served in order.
+        """
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                print(f"  Rate limit reached for {self.domain}. Waiting {wait:.0f}s...")
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= 1
+
+
+_BASE36_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def asin_key(asin: str) -> int:
+    """Pack a 10-char alphanumeric ASIN into an int (it reads as base 36).
+
+    The int is exact, below 2**52, and cheaper to hash and store than the str.
+    """
+    return int(asin, 36)
+
+
+def asin_from_key(key: int) -> str:
+    """Inverse of asin_key: the upper-case 10-char ASIN."""
+    chars = []
+    for _ in range(10):
+        key, digit = divmod(key, 36)
+        chars.append(_BASE36_DIGITS[digit])
+    return "".join(reversed(chars))
 
 
 class RateLimiter:
-    """Per-domain rate limiter: max N requests per hour."""
+    """Per-domain rate limiter: max N requests per hour, one bucket per domain.
+
+    Waiting on one domain never blocks workers scraping another.
+    """
 
     def __init__(self, max_per_hour: int = MAX_REQUESTS_PER_HOUR):
         self.max_per_hour = max_per_hour
-        self.timestamps: dict[str, list[float]] = defaultdict(list)
-
-    def can_request(self, domain: str) -> bool:
-        now = time.time()
-        cutoff = now - 3600
-        self.timestamps[domain] = [t for t in self.timestamps[domain] if t > cutoff]
-        return len(self.timestamps[domain]) < self.max_per_hour
+        self.buckets: dict[str, DomainTokenBucket] = {}
 
-    def record(self, domain: str):
-        self.timestamps[domain].append(time.time())
-
-    def wait_time(self, domain: str) -> float:
-        if self.can_request(domain):
-            return 0
-        oldest = min(self.timestamps[domain])
-        return max(0, oldest + 3600 - time.time())
+    async def acquire(self, domain: str):
+        """Wait for a free slot on domain and reserve it."""
+        bucket = self.buckets.get(domain)
+        if bucket is None:
+            bucket = self.buckets[domain] = DomainTokenBucket(domain, self.max_per_hour)
+        await bucket.acquire()
 
 
 class Stats:
@@ -195,15 +294,151 @@ class Stats:
         self.start_time = time.time()
 
 
-async def create_browser_context(playwright, stealth_enabled: bool):
-    """Create a new browser context with randomized fingerprint."""
+class ResultWriter:
+    """Append-only CSV + JSONL sink, flushed after every row.
+
+    Files are opened on the first row, so a run that finds nothing (or a
+    dry run) leaves no output behind, and a crash keeps everything so far.
+    """
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self._csv_file = None
+        self._jsonl_file = None
+        self._writer = None
+
+    def _open(self):
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._csv_file = open(self.output_path, "w", newline="", encoding="utf-8")
+        self._jsonl_file = open(self.output_path.with_suffix(".jsonl"), "wb")
+        self._writer = csv.DictWriter(self._csv_file, fieldnames=CSV_FIELDS)
+        self._writer.writeheader()
+
+    def write(self, row: dict):
+        if self._writer is None:
+            self._open()
+        self._writer.writerow(row)
+        self._jsonl_file.write(json_dumps(row) + b"\n")
+        self._csv_file.flush()
+        self._jsonl_file.flush()
+
+    def close(self):
+        if self._writer is not None:
+            self._csv_file.close()
+            self._jsonl_file.close()
+            print(f"Saved rows to {self.output_path} and .jsonl")
+
+
+class PageCache:
+    """SQLite store of search-page HTML with its ETag/Last-Modified validators.
+
+    Only responses that carry a validator are stored, since without one the
+    server cannot answer a conditional request with 304.
+    """
+
+    def __init__(self, path: Path, max_age: float = PAGE_CACHE_MAX_AGE_SECONDS):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.hits = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, "
+            "last_modified TEXT, content_type TEXT, body BLOB, fetched_at REAL)"
+        )
+
+    def get(self, url: str) -> tuple | None:
+        """(etag, last_modified, content_type, body) if cached and fresh."""
+        row = self._conn.execute(
+            "SELECT etag, last_modified, content_type, body, fetched_at "
+            "FROM pages WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None or time.time() - row[4] > self.max_age:
+            return None
+        return row[:4]
+
+    def put(self, url: str, etag, last_modified, content_type, body: bytes):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content_type, body, time.time()),
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+async def _fetch_document(route, cache: PageCache):
+    """Fetch a document conditionally; serve the cached body on 304."""
+    url = route.request.url
+    cached = cache.get(url)
+    headers = dict(route.request.headers)
+    if cached:
+        etag, last_modified = cached[0], cached[1]
+        if etag:
+            headers["if-none-match"] = etag
+        if last_modified:
+            headers["if-modified-since"] = last_modified
+
+    try:
+        response = await route.fetch(headers=headers)
+    except Exception:
+        await route.continue_()
+        return
+
+    if response.status == 304 and cached:
+        cache.hits += 1
+        await route.fulfill(
+            status=200,
+            headers={"content-type": cached[2] or "text/html"},
+            body=cached[3],
+        )
+        return
+
+    body = await response.body()
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if response.status == 200 and (etag or last_modified):
+        cache.put(url, etag, last_modified, response.headers.get("content-type"), body)
+    await route.fulfill(response=response, body=body)
+
+
+async def _route_request(route, cache: PageCache | None = None):
+    """Abort image/CSS/font/media requests; let documents and XHR through.
+
+    With a cache, top-level documents go through a conditional fetch.
+    """
+    resource_type = route.request.resource_type
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    elif resource_type == "document" and cache is not None:
+        await _fetch_document(route, cache)
+    else:
+        await route.continue_()
+
+
+async def launch_browser(playwright):
+    """Launch the long-lived Chromium instance a worker creates contexts from."""
+    return await playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+
+
+async def create_browser_context(
+    browser, stealth_enabled: bool, cache: PageCache | None = None
+):
+    """Create a new browser context with randomized fingerprint.
+
+    Playwright keeps every request/response of a context alive until the
+    context is closed, so callers close it after each keyword.
+    """
     ua = random.choice(USER_AGENTS)
     viewport = random.choice(VIEWPORTS)
 
-    browser = await playwright.chromium.launch(headless=True)
     context = await browser.new_context(
         user_agent=ua,
         viewport=viewport,
+        java_script_enabled=True,  # Amazon renders results with JS
+        has_touch=False,
+        is_mobile=False,
         locale=random.choice(["de-DE", "en-GB", "fr-FR", "it-IT", "es-ES"]),
         timezone_id=random.choice(
             [
@@ -216,6 +451,11 @@ async def create_browser_context(playwright, stealth_enabled: bool):
         ),
     )
 
+    # Context-level route covers every page opened in this context
+    async def handle_route(route):
+        await _route_request(route, cache)
+
+    await context.route("**/*", handle_route)
     page = await context.new_page()
 
     # Apply stealth if available
@@ -232,39 +472,87 @@ async def create_browser_context(playwright, stealth_enabled: bool):
         """
         )
 
-    return browser, context, page
+    return context, page
+
+
+# Reads every field of the first `limit` result tiles in one browser round-trip.
+# A missing element yields null; price falls back to .a-price-whole only when
+# .a-price .a-offscreen does not exist at all.
+EXTRACT_TILES_JS = """
+(limit) => Array.from(document.querySelectorAll(".s-result-item[data-asin]"))
+    .slice(0, limit)
+    .map((el) => {
+        const text = (sel) => {
+            const node = el.querySelector(sel);
+            return node ? node.innerText : null;
+        };
+        return {
+            asin: el.getAttribute("data-asin"),
+            title: text("h2 a span, .a-color-base.a-text-normal"),
+            priceText: text(".a-price .a-offscreen") ?? text(".a-price-whole"),
+            ratingText: text(".a-icon-star-small .a-icon-alt, .a-icon-star .a-icon-alt"),
+        };
+    })
+"""
 
 
-async def scrape_search_page(
-    page, market: str, keyword: str, page_num: int, max_results: int = 25
-) -> list[dict]:
-    """Scrape a single Amazon search results page."""
-    results = []
+async def is_captcha_page(page, url: str | None = None) -> bool:
+    """Detect Amazon's captcha via the URL and a selector probe.
 
-    domain = DOMAIN_MAP[market]
-    search = keyword.replace(" ", "+")
+    Counting matches runs in the browser, so unlike page.content() no
+    serialized DOM is shipped back to Python.
+    """
+    if "captcha" in (url or page.url).lower():
+        return True
+    return await page.locator(CAPTCHA_SELECTOR).count() > 0
+
+
+def search_urls(market: str, keyword: str, max_pages: int) -> tuple[str, ...]:
+    """Search result URLs (with category filter) for pages 1..max_pages."""
     cat_node = CATEGORY_NODES.get(market, "")
+    base = f"https://www.{DOMAIN_MAP[market]}/s?k={quote_plus(keyword)}"
+    suffix = f"&rh=n:{cat_node}" if cat_node else ""
+    return tuple(f"{base}&page={n}{suffix}" for n in range(1, max_pages + 1))
+
+
+async def _goto_with_retry(page, url: str, attempts: int = GOTO_ATTEMPTS):
+    """page.goto with exponential backoff; re-raises after the last attempt.
+
+    Playwright raises its Error for net::ERR_* failures and its TimeoutError,
+    a subclass of Error, for navigation timeouts; catching Error covers both.
+    """
+    for attempt in range(attempts):
+        try:
+            return await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+        except PlaywrightError as e:
+            if attempt == attempts - 1:
+                raise
+            delay = 0.5 * 2**attempt + random.uniform(0, 0.5)
+            print(f"    Navigation failed ({e}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def scrape_search_page(
+    page, market: str, keyword: str, page_num: int, url: str, max_results: int = 25
+) -> tuple[list[dict], bool]:
+    """Scrape a single Amazon search results page.
 
-    # Build URL with category filter
-    url = f"https://www.{domain}/s?k={search}&page={page_num}"
-    if cat_node:
-        url += f"&rh=n:{cat_node}"
+    Returns (results, captcha_detected), so the caller can tell a captcha
+    apart from an empty page or a failed request.
+    """
+    results = []
 
     try:
-        response = await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+        response = await _goto_with_retry(page, url)
 
         if response and response.status >= 400:
             print(f"    HTTP {response.status} for {market}/{keyword} p{page_num}")
-            return results
-
-        await asyncio.sleep(random.uniform(1.0, 2.5))
+            return results, False
 
-        # Check for captcha
-        current_url = page.url.lower()
-        page_content = await page.content()
-        if "captcha" in current_url or "captcha" in page_content.lower()[:2000]:
+        # Check for captcha; the DOM is parsed, so no settle delay is needed
+        if await is_captcha_page(page, response.url if response else None):
             print(f"    CAPTCHA detected on {market}/{keyword} p{page_num}!")
-            return []  # Signal captcha to caller
+            return [], True
 
         # Wait for product results
         try:
@@ -273,43 +561,34 @@ async def scrape_search_page(
             )
         except Exception:
             print(f"    No products found: {market}/{keyword} p{page_num}")
-            return results
+            return results, False
 
-        # Extract ASINs and product info
-        products = await page.query_selector_all(".s-result-item[data-asin]")
+        # Extract ASINs and product info in a single evaluate round-trip
+        tiles = await page.evaluate(EXTRACT_TILES_JS, max_results)
+        scraped_at = datetime.now(timezone.utc).isoformat()  # Same for the page
 
-        for product in products[:max_results]:
+        for tile in tiles:
             try:
-                asin = await product.get_attribute("data-asin")
-                if not asin or len(asin) != 10 or not asin.startswith("B"):
+                asin = tile["asin"]
+                if (
+                    not asin
+                    or len(asin) != 10
+                    or not asin.startswith("B")
+                    or not (asin.isascii() and asin.isalnum())
+                ):
                     continue
 
                 # Title
-                title_elem = await product.query_selector(
-                    "h2 a span, .a-color-base.a-text-normal"
-                )
-                title = ""
-                if title_elem:
-                    title = (await title_elem.inner_text()).strip()[:150]
+                title = (tile["title"] or "").strip()[:150]
 
                 if not title:
                     continue
 
                 # Price
                 price = None
-                price_elem = await product.query_selector(".a-price .a-offscreen")
-                if not price_elem:
-                    price_elem = await product.query_selector(".a-price-whole")
-                if price_elem:
+                if tile["priceText"] is not None:
                     try:
-                        price_text = await price_elem.inner_text()
-                        price_text = (
-                            price_text.replace("€", "")
-                            .replace("£", "")
-                            .replace("\xa0", "")
-                            .replace(",", ".")
-                            .strip()
-                        )
+                        price_text = tile["priceText"].translate(_PRICE_TRANS).strip()
                         # Handle "29.99" or "29" format
                         price = float(price_text)
                     except (ValueError, TypeError):
@@ -317,15 +596,13 @@ async def scrape_search_page(
 
                 # Rating
                 rating = None
-                rating_elem = await product.query_selector(
-                    ".a-icon-star-small .a-icon-alt, .a-icon-star .a-icon-alt"
-                )
-                if rating_elem:
+                if tile["ratingText"] is not None:
                     try:
-                        rating_text = await rating_elem.inner_text()
                         # "4,3 von 5 Sternen" or "4.3 out of 5 stars"
                         rating_num = (
-                            rating_text.split(" ")[0].replace(",", ".")
+                            tile["ratingText"]
+                            .partition(" ")[0]
+                            .translate(_DECIMAL_COMMA_TRANS)
                         )
                         rating = float(rating_num)
                     except (ValueError, TypeError, IndexError):
@@ -341,7 +618,7 @@ async def scrape_search_page(
                         "keyword": keyword,
                         "page": page_num,
                         "source": "amazon_scrape",
-                        "scraped_at": datetime.now(timezone.utc).isoformat(),
+                        "scraped_at": scraped_at,
                     }
                 )
 
@@ -351,106 +628,132 @@ async def scrape_search_page(
     except Exception as e:
         print(f"    Error scraping {market}/{keyword} p{page_num}: {e}")
 
-    return results
+    return results, False
 
 
-async def scrape_all(markets: list[str], dry_run: bool = False):
-    """Main scraping loop across all markets and keywords."""
+def build_work_items(
+    markets: list[str], max_pages: int
+) -> list[tuple[str, str, tuple[str, ...]]]:
+    """(market, keyword, page URLs) items, interleaved across markets.
+
+    Round-robin order spreads concurrent workers over different domains
+    instead of having them all queue on one domain's rate limit.
+    """
+    per_market = [
+        [(m, kw, search_urls(m, kw, max_pages)) for kw in SEARCH_KEYWORDS.get(m, [])]
+        for m in markets
+    ]
+    return [item for group in zip_longest(*per_market) for item in group if item]
+
+
+async def scrape_all(
+    markets: list[str],
+    output_path: Path,
+    dry_run: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    use_cache: bool = True,
+):
+    """Main scraping loop: a pool of workers pulls (market, keyword) items.
+
+    New rows are written to output_path as they arrive; only the per-market
+    ASIN keys (see asin_key, insertion-ordered) are kept in memory for dedup.
+    """
     stats = Stats()
     rate_limiter = RateLimiter(MAX_REQUESTS_PER_HOUR)
-    all_results = []
-    seen_asins: dict[str, set] = defaultdict(set)  # per-market dedup
-    request_count = 0
+    writer = ResultWriter(output_path)
+    cache = (
+        PageCache(output_path.with_suffix(".cache.sqlite"))
+        if use_cache and not dry_run
+        else None
+    )
+    seen_asins: dict[str, dict[int, None]] = defaultdict(dict)  # per-market dedup
+
+    work = asyncio.Queue()
+    for item in build_work_items(markets, MAX_PAGES):
+        work.put_nowait(item)
+    print(f"\nScraping {work.qsize()} keywords with {concurrency} workers")
 
     async with async_playwright() as p:
-        browser, context, page = await create_browser_context(
-            p, stealth_enabled=True
-        )
 
-        for market in markets:
-            keywords = SEARCH_KEYWORDS.get(market, [])
+        async def worker():
+            """Scrape keywords from the queue, one fresh context per keyword."""
+            browser = await launch_browser(p)
+            try:
+                while not work.empty():
+                    market, keyword, urls = work.get_nowait()
+                    context, page = await create_browser_context(
+                        browser, stealth_enabled=True, cache=cache
+                    )
+                    try:
+                        await scrape_keyword(page, market, keyword, urls)
+                    finally:
+                        await context.close()
+            finally:
+                await browser.close()
+
+        async def scrape_keyword(page, market: str, keyword: str, urls: tuple):
+            """Scrape the result pages of one keyword, stopping at an empty one."""
             domain = DOMAIN_MAP[market]
-            print(f"\n{'='*60}")
-            print(f"SCRAPING {market} ({domain}) — {len(keywords)} keywords")
-            print(f"{'='*60}")
-
-            for keyword in keywords:
-                for page_num in range(1, MAX_PAGES + 1):
-                    # Rate limiting check
-                    wait = rate_limiter.wait_time(domain)
-                    if wait > 0:
-                        print(
-                            f"  Rate limit reached for {domain}. "
-                            f"Waiting {wait:.0f}s..."
-                        )
-                        await asyncio.sleep(wait)
-
-                    # Context rotation
-                    request_count += 1
-                    if request_count % CONTEXT_ROTATION_INTERVAL == 0:
-                        print("  Rotating browser context...")
-                        await browser.close()
-                        browser, context, page = await create_browser_context(
-                            p, stealth_enabled=True
-                        )
 
-                    # Random delay between requests
-                    delay = random.uniform(REQUEST_DELAY_MIN, REQUEST_DELAY_MAX)
-                    await asyncio.sleep(delay)
+            for page_num, url in enumerate(urls, start=1):
+                # Rate limiting: reserve a slot for this domain
+                if not dry_run:
+                    await rate_limiter.acquire(domain)
 
-                    print(
-                        f"  [{market}] {keyword} (p{page_num}) "
-                        f"[req #{stats.total_requests + 1}]..."
-                    )
+                # Small jitter so workers don't hit a domain in lockstep
+                delay = random.uniform(REQUEST_DELAY_MIN, REQUEST_DELAY_MAX)
+                await asyncio.sleep(delay)
+
+                stats.total_requests += 1
+                print(
+                    f"  [{market}] {keyword} (p{page_num}) "
+                    f"[req #{stats.total_requests}]..."
+                )
 
-                    if dry_run:
-                        print(f"    DRY RUN — would scrape {domain}")
-                        continue
+                if dry_run:
+                    print(f"    DRY RUN — would scrape {domain}")
+                    continue
+
+                results, captcha = await scrape_search_page(
+                    page, market, keyword, page_num, url
+                )
 
-                    results = await scrape_search_page(
-                        page, market, keyword, page_num
+                # Only a detected captcha pauses; errors and empty pages don't
+                if captcha:
+                    stats.captchas += 1
+                    print(
+                        f"    CAPTCHA! Pausing {CAPTCHA_PAUSE_SECONDS}s; "
+                        f"next keyword gets a fresh context..."
                     )
-                    stats.total_requests += 1
-                    rate_limiter.record(domain)
-
-                    # Handle captcha (empty results = captcha signal)
-                    if not results and page_num == 1:
-                        # Could be captcha or no results
-                        content = await page.content()
-                        if "captcha" in content.lower()[:2000]:
-                            stats.captchas += 1
-                            print(
-                                f"    CAPTCHA! Pausing {CAPTCHA_PAUSE_SECONDS}s "
-                                f"and rotating context..."
-                            )
-                            await browser.close()
-                            await asyncio.sleep(CAPTCHA_PAUSE_SECONDS)
-                            browser, context, page = await create_browser_context(
-                                p, stealth_enabled=True
-                            )
-                            break  # Skip remaining pages for this keyword
-
-                    # Dedup within market
-                    new_count = 0
-                    for r in results:
-                        if r["asin"] not in seen_asins[market]:
-                            seen_asins[market].add(r["asin"])
-                            all_results.append(r)
-                            new_count += 1
-
-                    stats.by_market[market] += new_count
-                    stats.total_asins += new_count
-                    print(f"    +{new_count} new ASINs (total: {stats.total_asins})")
-
-                    # If no results on this page, skip remaining pages
-                    if len(results) == 0:
-                        break
-
-            print(
-                f"\n  {market} subtotal: {stats.by_market[market]} unique ASINs"
-            )
+                    await asyncio.sleep(CAPTCHA_PAUSE_SECONDS)
+                    return  # Skip remaining pages for this keyword
+
+                # Dedup within market
+                new_count = 0
+                for r in results:
+                    key = asin_key(r["asin"])
+                    if key not in seen_asins[market]:
+                        seen_asins[market][key] = None
+                        writer.write(r)
+                        new_count += 1
+
+                stats.by_market[market] += new_count
+                stats.total_asins += new_count
+                print(
+                    f"    [{market}] +{new_count} new ASINs "
+                    f"(total: {stats.total_asins})"
+                )
 
-        await browser.close()
+                # If no results on this page, skip remaining pages
+                if len(results) == 0:
+                    return
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        finally:
+            writer.close()
+            if cache is not None:
+                cache.close()
 
     elapsed = time.time() - stats.start_time
     print(f"\n{'='*60}")
@@ -458,55 +761,39 @@ async def scrape_all(markets: list[str], dry_run: bool = False):
     print(f"  Total ASINs: {stats.total_asins}")
     print(f"  Requests: {stats.total_requests}")
     print(f"  Captchas: {stats.captchas}")
+    if cache is not None:
+        print(f"  Page cache hits (304): {cache.hits}")
     print(f"  Duration: {elapsed/60:.1f} minutes")
     print(f"  By market: {dict(stats.by_market)}")
     print(f"{'='*60}")
 
-    return all_results, stats
+    return seen_asins, stats
 
 
-def save_results(results: list[dict], output_path: Path):
-    """Save results to CSV and JSON."""
+def save_results(seen_asins: dict[str, dict[int, None]], output_path: Path):
+    """Save the JSON summary; the rows were already streamed to CSV/JSONL."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # CSV
-    fieldnames = [
-        "asin",
-        "title",
-        "price",
-        "rating",
-        "market",
-        "keyword",
-        "page",
-        "source",
-        "scraped_at",
-    ]
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results)
-
-    print(f"Saved {len(results)} ASINs to {output_path}")
-
-    # JSON (with metadata)
+    # JSON (with metadata); per-market keys are already unique
     json_path = output_path.with_suffix(".json")
-    markets_found = sorted(set(r["market"] for r in results))
-    by_market = defaultdict(list)
-    for r in results:
-        by_market[r["market"]].append(r["asin"])
+    all_keys: dict[int, None] = {}
+    for keys in seen_asins.values():
+        all_keys.update(keys)
+    by_market = {
+        m: [asin_from_key(k) for k in keys] for m, keys in seen_asins.items() if keys
+    }
 
     payload = {
         "_meta": {
             "generated_at": datetime.now(timezone.utc).isoformat(),
-            "total": len(results),
-            "markets": markets_found,
+            "total": sum(len(asins) for asins in by_market.values()),
+            "markets": sorted(by_market),
             "by_market_count": {m: len(asins) for m, asins in by_market.items()},
         },
-        "asins": list(dict.fromkeys(r["asin"] for r in results)),
-        "by_market": {m: list(dict.fromkeys(asins)) for m, asins in by_market.items()},
+        "asins": [asin_from_key(k) for k in all_keys],
+        "by_market": by_market,
     }
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
+    json_path.write_bytes(json_dumps_pretty(payload))
 
     print(f"Saved JSON to {json_path}")
 
@@ -537,6 +824,17 @@ async def main():
         action="store_true",
         help="Show what would be scraped without actually scraping",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Keywords scraped in parallel (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always fetch search pages without conditional request headers",
+    )
     parser.add_argument(
         "--pages",
         type=int,
@@ -558,21 +856,36 @@ async def main():
             return
 
     total_requests = sum(len(SEARCH_KEYWORDS[m]) for m in markets) * MAX_PAGES
-    est_hours = total_requests * ((REQUEST_DELAY_MIN + REQUEST_DELAY_MAX) / 2) / 3600
+    # Domains pace independently: the busiest one past its first full bucket
+    # bounds the run, plus jitter spread over the workers
+    busiest = max(len(SEARCH_KEYWORDS[m]) * MAX_PAGES for m in markets)
+    est_hours = max(0, busiest - MAX_REQUESTS_PER_HOUR) / MAX_REQUESTS_PER_HOUR + (
+        total_requests
+        * ((REQUEST_DELAY_MIN + REQUEST_DELAY_MAX) / 2)
+        / 3600
+        / max(1, args.concurrency)
+    )
 
     print(f"Amazon Keyboard ASIN Scraper v3")
     print(f"  Markets: {markets}")
     print(f"  Keywords: {sum(len(SEARCH_KEYWORDS[m]) for m in markets)}")
     print(f"  Pages/keyword: {MAX_PAGES}")
+    print(f"  Concurrency: {args.concurrency}")
     print(f"  Est. requests: {total_requests}")
     print(f"  Est. duration: {est_hours:.1f} hours")
     print(f"  Stealth: {'YES' if STEALTH_AVAILABLE else 'NO (install playwright-stealth)'}")
 
-    results, stats = await scrape_all(markets, dry_run=args.dry_run)
+    output = Path(__file__).parent.parent / args.output
+    seen_asins, stats = await scrape_all(
+        markets,
+        output,
+        dry_run=args.dry_run,
+        concurrency=args.concurrency,
+        use_cache=not args.no_cache,
+    )
 
-    if results:
-        output = Path(__file__).parent.parent / args.output
-        save_results(results, output)
+    if stats.total_asins:
+        save_results(seen_asins, output)
 
 
 if __name__ == "__main__":
@@ -15,53 +15,46 @@ def get_es_client():
     return Elasticsearch([ES_HOST])
 
 
-def check_zero_price(client):
-    """Check for products with current_price == 0 (CRITICAL)."""
-    query = {"query": {"term": {"current_price": 0}}}
-    try:
-        result = client.count(index=DEALS_INDEX, body=query)
-        return result["count"]
-    except Exception:
-        return 0
-
-
-def check_missing_price(client):
-    """Check for documents missing current_price field (ERROR)."""
-    query = {"query": {"bool": {"must_not": {"exists": {"field": "current_price"}}}}}
-    try:
-        result = client.count(index=DEALS_INDEX, body=query)
-        return result["count"]
-    except Exception:
-        return 0
-
+def _filter(clause):
+    """Wrap a clause in filter context: no scoring, eligible for the filter cache."""
+    return {"constant_score": {"filter": clause}}
+
+
+# (name, index, query) of every count check, in report order
+CHECKS = [
+    ("zero_price", DEALS_INDEX, _filter({"term": {"current_price": 0}})),
+    (
+        "missing_price",
+        DEALS_INDEX,
+        _filter({"bool": {"must_not": {"exists": {"field": "current_price"}}}}),
+    ),
+    ("no_discount", DEALS_INDEX, _filter({"term": {"discount_percent": 0}})),
+    ("rating_zero", DEALS_INDEX, _filter({"term": {"rating": 0}})),
+    ("arbitrage", ARBITRAGE_INDEX, {"match_all": {}}),
+]
+
+
+def run_checks(client):
+    """Count matches for all CHECKS in a single msearch round-trip.
+
+    Each size-0 search opts into the shard request cache, so repeated runs
+    are served from cache until the index refreshes. A failed sub-search,
+    or a failed request, counts as 0.
+    """
+    searches = []
+    for _, index, query in CHECKS:
+        searches.append({"index": index, "request_cache": True})
+        searches.append({"query": query, "size": 0, "track_total_hits": True})
 
-def check_no_discount(client):
-    """Check for deals with discount_percent == 0 (WARNING)."""
-    query = {"query": {"term": {"discount_percent": 0}}}
     try:
-        result = client.count(index=DEALS_INDEX, body=query)
-        return result["count"]
+        responses = client.msearch(searches=searches)["responses"]
     except Exception:
-        return 0
+        return {name: 0 for name, _, _ in CHECKS}
 
-
-def check_rating_zero(client):
-    """Check for deals with rating == 0 (WARNING)."""
-    query = {"query": {"term": {"rating": 0}}}
-    try:
-        result = client.count(index=DEALS_INDEX, body=query)
-        return result["count"]
-    except Exception:
-        return 0
-
-
-def check_arbitrage_opportunities(client):
-    """Check for arbitrage opportunities count (INFO)."""
-    try:
-        result = client.count(index=ARBITRAGE_INDEX, body={"query": {"match_all": {}}})
-        return result["count"]
-    except Exception:
-        return 0
+    return {
+        name: 0 if "error" in response else response["hits"]["total"]["value"]
+        for (name, _, _), response in zip(CHECKS, responses)
+    }
 
 
 def main():
@@ -73,26 +66,27 @@ def main():
         sys.exit(1)
 
     alerts = []
+    counts = run_checks(client)
 
-    zero_price_count = check_zero_price(client)
+    zero_price_count = counts["zero_price"]
     if zero_price_count > 0:
         alerts.append(f"🚨 [CRITICAL] {zero_price_count} products with 0€ price found")
 
-    missing_price_count = check_missing_price(client)
+    missing_price_count = counts["missing_price"]
     if missing_price_count > 0:
         alerts.append(
             f"🚨 [ERROR] {missing_price_count} documents missing current_price field"
         )
 
-    no_discount_count = check_no_discount(client)
+    no_discount_count = counts["no_discount"]
     if no_discount_count > 0:
         alerts.append(f"🟡 [WARNING] {no_discount_count} deals with 0% discount")
 
-    rating_zero_count = check_rating_zero(client)
+    rating_zero_count = counts["rating_zero"]
     if rating_zero_count > 0:
         alerts.append(f"🟡 [WARNING] {rating_zero_count} deals with 0 rating")
 
-    arbitrage_count = check_arbitrage_opportunities(client)
+    arbitrage_count = counts["arbitrage"]
     if arbitrage_count == 0:
         alerts.append(f"ℹ️ [INFO] No arbitrage opportunities found")
     else:
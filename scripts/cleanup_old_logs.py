@@ -11,10 +11,11 @@ Cron example:
     0 2 * * * /path/to/venv/bin/python /home/smlflg/DataEngeeneeringKEEPA/KeepaProjectsforDataEngeneering3BranchesMerge/scripts/cleanup_old_logs.py >> /var/log/es_cleanup.log 2>&1
 """
 
+import asyncio
 import logging
 import sys
 from datetime import datetime, timedelta, timezone
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,6 +30,9 @@ INDICES = {
     "keeper-deals": "timestamp",
     "keeper-prices": "timestamp",
 }
+# Backoff between polls of a running delete task
+TASK_POLL_INITIAL_SECONDS = 1.0
+TASK_POLL_MAX_SECONDS = 30.0
 
 
 def get_cutoff_date() -> str:
@@ -36,41 +40,85 @@ def get_cutoff_date() -> str:
     return cutoff.isoformat()
 
 
-def cleanup_index(es: Elasticsearch, index: str, date_field: str, cutoff: str) -> int:
+async def start_cleanup(
+    es: AsyncElasticsearch, index: str, date_field: str, cutoff: str
+) -> str | None:
+    """Submit a sliced delete-by-query as a background task; return its id."""
     query = {"range": {date_field: {"lt": cutoff}}}
 
     try:
-        response = es.delete_by_query(
+        response = await es.delete_by_query(
             index=index,
             body={"query": query},
             conflicts="proceed",
+            slices="auto",
+            wait_for_completion=False,
         )
-        deleted = response.get("deleted", 0)
-        logger.info(f"[{index}] Deleted {deleted} documents older than {cutoff}")
-        return deleted
+        task_id = response["task"]
+        logger.info(f"[{index}] Submitted delete task {task_id}")
+        return task_id
     except Exception as e:
         logger.error(f"[{index}] Error during cleanup: {e}")
+        return None
+
+
+async def wait_for_cleanup(
+    es: AsyncElasticsearch, index: str, task_id: str, cutoff: str
+) -> int:
+    """Poll a delete task with exponential backoff; return documents deleted."""
+    delay = TASK_POLL_INITIAL_SECONDS
+    while True:
+        try:
+            task = await es.tasks.get(task_id=task_id)
+        except Exception as e:
+            logger.error(f"[{index}] Error polling task {task_id}: {e}")
+            return 0
+
+        if task.get("completed"):
+            break
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, TASK_POLL_MAX_SECONDS)
+
+    if task.get("error"):
+        logger.error(f"[{index}] Delete task failed: {task['error']}")
+    result = task.get("response") or task["task"]["status"]
+    deleted = result.get("deleted", 0)
+    logger.info(f"[{index}] Deleted {deleted} documents older than {cutoff}")
+    return deleted
+
+
+async def cleanup_index(
+    es: AsyncElasticsearch, index: str, date_field: str, cutoff: str
+) -> int:
+    """Delete documents older than cutoff from one index; return the count."""
+    task_id = await start_cleanup(es, index, date_field, cutoff)
+    if task_id is None:
         return 0
+    return await wait_for_cleanup(es, index, task_id, cutoff)
 
 
-def main():
+async def main():
     cutoff = get_cutoff_date()
     logger.info(
         f"Starting Elasticsearch cleanup (retention: {RETENTION_DAYS} days, cutoff: {cutoff})"
     )
 
     try:
-        es = Elasticsearch(ES_HOST)
-        if not es.ping():
-            logger.error("Cannot connect to Elasticsearch")
-            sys.exit(1)
-
-        logger.info(f"Connected to Elasticsearch at {ES_HOST}")
-
-        total_deleted = 0
-        for index, date_field in INDICES.items():
-            deleted = cleanup_index(es, index, date_field, cutoff)
-            total_deleted += deleted
+        async with AsyncElasticsearch(ES_HOST) as es:
+            if not await es.ping():
+                logger.error("Cannot connect to Elasticsearch")
+                sys.exit(1)
+
+            logger.info(f"Connected to Elasticsearch at {ES_HOST}")
+
+            # Indices are independent: submit and poll them all concurrently
+            deleted = await asyncio.gather(
+                *(
+                    cleanup_index(es, index, date_field, cutoff)
+                    for index, date_field in INDICES.items()
+                )
+            )
+            total_deleted = sum(deleted)
 
         logger.info(f"Cleanup complete. Total documents deleted: {total_deleted}")
 
@@ -80,4 +128,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -28,21 +28,35 @@ import csv
 import json
 import logging
 import os
+import re
+import unicodedata
 import sys
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
 
-import importlib.util
+import httpx
 
-spec = importlib.util.spec_from_file_location(
-    "keepa_client_module",
-    Path(__file__).parent.parent / "src" / "services" / "keepa_client.py",
-)
-keepa_client_module = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(keepa_client_module)
-KeepaClient = keepa_client_module.KeepaClient
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.keepa_client import KeepaClient
+from src.services.keepa_token_bucket import KeepaTokenBucket
+from src.utils.json_codec import json_dumps_pretty, json_loads
+
+try:
+    import h2  # noqa: F401  (httpx only negotiates HTTP/2 when h2 is installed)
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; fall back to substring scans
+    ahocorasick = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -60,6 +74,9 @@ DOMAINS = {
     "ES": 9,
 }
 
+# present_markets is a bitmask over DOMAINS: DE=1, UK=2, FR=4, IT=8, ES=16
+MARKET_BIT = {market: 1 << i for i, market in enumerate(DOMAINS)}
+
 # --- Layout Detection: Multi-Layer ---
 
 # Layer 1: Title keyword matching
@@ -151,6 +168,74 @@ KNOWN_QWERTZ_MODELS = [
     "medion akoya",
 ]
 
+
+def _fold_char(ch: str) -> str:
+    """Lowercase ch and strip its diacritics ("É" -> "e"); ch if not ASCII-foldable."""
+    decomposed = unicodedata.normalize("NFKD", ch.lower())
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return folded if folded.isascii() else ch
+
+
+# One translate() table that lowercases and de-accents Latin text in a single
+# C-level pass. Keywords are ASCII, so characters outside A-Z and the Latin
+# blocks can never match and are left untouched.
+_FOLD = str.maketrans(
+    {
+        ch: folded
+        for ch in map(chr, [*range(ord("A"), ord("Z") + 1), *range(0xC0, 0x250)])
+        if (folded := _fold_char(ch)) != ch
+    }
+)
+
+
+def _fold(text: str) -> str:
+    """Lowercase + de-accent text for keyword matching ("Español" -> "espanol")."""
+    return text.translate(_FOLD)
+
+
+def _build_automaton(patterns: dict[str, object]):
+    """Aho-Corasick automaton mapping each pattern to its value, or None."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for pattern, value in patterns.items():
+        automaton.add_word(pattern, value)
+    automaton.make_automaton()
+    return automaton
+
+
+# Layer 1/2 automata: one C-level pass over the text instead of a substring
+# scan per keyword. Values carry the layout's rank in LAYOUT_TITLE_KEYWORDS
+# so the earliest-listed layout still wins when several match.
+_LAYOUT_AUTOMATON = _build_automaton(
+    {
+        _fold(kw): (rank, layout)
+        for rank, (layout, keywords) in reversed(
+            list(enumerate(LAYOUT_TITLE_KEYWORDS.items()))
+        )
+        for kw in keywords
+    }
+)
+_QWERTZ_MODEL_AUTOMATON = _build_automaton(
+    dict.fromkeys(map(_fold, KNOWN_QWERTZ_MODELS))
+)
+
+
+def _alternation(keywords: list[str]) -> re.Pattern:
+    return re.compile("|".join(re.escape(_fold(kw)) for kw in keywords))
+
+
+# Fallback without pyahocorasick: one precompiled alternation per layout
+# (in priority order) and one for all models, instead of a scan per keyword
+_LAYOUT_PATTERNS = [
+    (layout, _alternation(keywords))
+    for layout, keywords in LAYOUT_TITLE_KEYWORDS.items()
+]
+_QWERTZ_MODEL_PATTERN = _alternation(KNOWN_QWERTZ_MODELS)
+
+# Layer 3: GS1 prefixes 400-440 (Germany), as the 3-char strings EANs start with
+DE_EAN_PREFIXES = frozenset(str(n) for n in range(400, 441))
+
 # Expected layout per market
 EXPECTED_LAYOUT = {
     "DE": "qwertz",
@@ -160,6 +245,12 @@ EXPECTED_LAYOUT = {
     "ES": "qwerty_es",
 }
 
+# Keepa /product batches in flight at once during validation
+VALIDATE_CONCURRENCY = 3
+PRODUCT_TOKEN_COST_PER_ASIN = 1
+# Keep-alive pool shared by the token check and every /product batch
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=32)
+
 stats = {
     "sources": {},
     "total_raw": 0,
@@ -187,6 +278,27 @@ def get_api_key() -> str:
 # ===== Phase 3a: Merge =====
 
 
+def _iter_csv(path: Path, columns: tuple[str, ...]):
+    """Yield a tuple of the named columns per CSV row ("" if a column is absent).
+
+    A plain csv.reader plus header positions avoids building the per-row dict
+    of every column that csv.DictReader allocates.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        positions = [header.index(c) if c in header else len(header) for c in columns]
+        get = itemgetter(*positions)
+        width = max(positions) + 1
+        pad = [""] * width
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row += pad[len(row) :]
+            yield get(row)
+
+
 def load_keepa_search(path: Path) -> dict[str, dict]:
     """Load ASINs from keepa_search_qwertz.csv."""
     asins = {}
@@ -194,22 +306,32 @@ def load_keepa_search(path: Path) -> dict[str, dict]:
         log.warning(f"  Not found: {path}")
         return asins
 
-    with open(path, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            asin = row.get("asin", "").strip().upper()
-            if asin and len(asin) == 10:
-                asins[asin] = {
-                    "asin": asin,
-                    "title": row.get("title", ""),
-                    "market": row.get("market", ""),
-                    "domain_id": int(row.get("domain_id", 0)),
-                    "new_price": _parse_float(row.get("new_price")),
-                    "used_price": _parse_float(row.get("used_price")),
-                    "brand": row.get("brand", ""),
-                    "ean": row.get("ean", ""),
-                    "source": "keepa_search",
-                }
+    columns = (
+        "asin",
+        "title",
+        "market",
+        "domain_id",
+        "new_price",
+        "used_price",
+        "brand",
+        "ean",
+    )
+    for asin, title, market, domain_id, new_price, used_price, brand, ean in _iter_csv(
+        path, columns
+    ):
+        asin = asin.strip().upper()
+        if asin and len(asin) == 10:
+            asins[asin] = {
+                "asin": asin,
+                "title": title,
+                "market": market,
+                "domain_id": int(domain_id or 0),
+                "new_price": _parse_float(new_price),
+                "used_price": _parse_float(used_price),
+                "brand": brand,
+                "ean": ean,
+                "source": "keepa_search",
+            }
 
     log.info(f"  keepa_search: {len(asins)} ASINs")
     return asins
@@ -222,19 +344,19 @@ def load_amazon_scrape(path: Path) -> dict[str, dict]:
         log.warning(f"  Not found: {path}")
         return asins
 
-    with open(path, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            asin = row.get("asin", "").strip().upper()
-            if asin and len(asin) == 10:
-                asins[asin] = {
-                    "asin": asin,
-                    "title": row.get("title", ""),
-                    "market": row.get("market", ""),
-                    "new_price": _parse_float(row.get("price")),
-                    "brand": "",
-                    "source": "amazon_scrape",
-                }
+    for asin, title, market, price in _iter_csv(
+        path, ("asin", "title", "market", "price")
+    ):
+        asin = asin.strip().upper()
+        if asin and len(asin) == 10:
+            asins[asin] = {
+                "asin": asin,
+                "title": title,
+                "market": market,
+                "new_price": _parse_float(price),
+                "brand": "",
+                "source": "amazon_scrape",
+            }
 
     log.info(f"  amazon_scrape: {len(asins)} ASINs")
     return asins
@@ -246,7 +368,7 @@ def load_static_pool(json_path: Path, txt_path: Path) -> dict[str, dict]:
 
     if json_path.exists():
         try:
-            data = json.loads(json_path.read_text())
+            data = json_loads(json_path.read_bytes())
             asin_list = data.get("all_asins", []) or data.get("asins", [])
             if not asin_list and isinstance(data, list):
                 asin_list = data
@@ -286,17 +408,15 @@ def load_chrome_extension(path: Path) -> dict[str, dict]:
         log.info("  chrome_extension: not found (optional)")
         return asins
 
-    with open(path, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            asin = row.get("asin", "").strip().upper()
-            if asin and len(asin) == 10:
-                asins[asin] = {
-                    "asin": asin,
-                    "title": row.get("title", ""),
-                    "market": row.get("market", ""),
-                    "source": "chrome_extension",
-                }
+    for asin, title, market in _iter_csv(path, ("asin", "title", "market")):
+        asin = asin.strip().upper()
+        if asin and len(asin) == 10:
+            asins[asin] = {
+                "asin": asin,
+                "title": title,
+                "market": market,
+                "source": "chrome_extension",
+            }
 
     log.info(f"  chrome_extension: {len(asins)} ASINs")
     return asins
@@ -306,17 +426,28 @@ def merge_sources(data_dir: Path) -> dict[str, dict]:
     """Merge all sources, dedup by ASIN, track sources."""
     log.info("Phase 3a: Merging sources...")
 
-    sources = {
-        "keepa_search": load_keepa_search(data_dir / "keepa_search_qwertz.csv"),
-        "amazon_scrape": load_amazon_scrape(data_dir / "amazon_asins_raw.csv"),
-        "static_pool": load_static_pool(
+    loaders = [
+        ("keepa_search", load_keepa_search, data_dir / "keepa_search_qwertz.csv"),
+        ("amazon_scrape", load_amazon_scrape, data_dir / "amazon_asins_raw.csv"),
+        (
+            "static_pool",
+            load_static_pool,
             data_dir / "seed_asins_eu_qwertz.json",
             data_dir / "seed_asins_eu_qwertz.txt",
         ),
-        "chrome_extension": load_chrome_extension(
-            data_dir / "chrome_extension_asins.csv"
+        (
+            "chrome_extension",
+            load_chrome_extension,
+            data_dir / "chrome_extension_asins.csv",
         ),
-    }
+    ]
+    # The loaders are independent file reads: parse them in parallel, then
+    # merge in the fixed order above so source precedence is unchanged
+    with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+        futures = {
+            name: executor.submit(loader, *paths) for name, loader, *paths in loaders
+        }
+        sources = {name: future.result() for name, future in futures.items()}
 
     # Merge with source tracking
     merged = {}
@@ -353,16 +484,141 @@ def merge_sources(data_dir: Path) -> dict[str, dict]:
 # ===== Phase 3b: Keepa /product Validation =====
 
 
+def _csv_price(csv_data: list, idx: int) -> float | None:
+    """Latest price (in EUR) of Keepa csv series idx, if positive."""
+    if (
+        len(csv_data) > idx
+        and csv_data[idx]
+        and len(csv_data[idx]) >= 2
+        and csv_data[idx][-1] > 0
+    ):
+        return csv_data[idx][-1] / 100.0
+    return None
+
+
+def _apply_product(entry: dict, product: dict, market: str):
+    """Merge one Keepa /product record for market into a merged entry."""
+    title = product.get("title", "")
+    brand = product.get("brand", "")
+    csv_data = product.get("csv") or []
+    ean_list = product.get("eanList") or []
+    sales_rank = product.get("salesRankReference")
+    description = product.get("description", "") or ""
+    features_list = product.get("features") or []
+    features_text = (
+        " ".join(features_list)
+        if isinstance(features_list, list)
+        else str(features_list)
+    )
+
+    # Update with richer data; each field is truncated once and the same
+    # string shared by the per-market and the fallback key
+    if description:
+        description = description[:500]
+        entry[f"description_{market}"] = description
+        if not entry.get("description"):
+            entry["description"] = description
+
+    if features_text.strip():
+        features_text = features_text[:500]
+        entry[f"features_{market}"] = features_text
+        if not entry.get("features"):
+            entry["features"] = features_text
+
+    if title:
+        title = title[:200]
+        entry[f"title_{market}"] = title
+        if not entry.get("title"):
+            entry["title"] = title
+
+    if brand and not entry.get("brand"):
+        entry["brand"] = brand
+
+    if ean_list and not entry.get("ean"):
+        entry["ean"] = ean_list[0]
+
+    if sales_rank:
+        entry[f"sales_rank_{market}"] = sales_rank
+
+    # Prices for this market
+    new_price = _csv_price(csv_data, 1)
+    used_price = _csv_price(csv_data, 2)
+    amazon_price = _csv_price(csv_data, 0)
+
+    entry[f"new_price_{market}"] = new_price or amazon_price
+    entry[f"used_price_{market}"] = used_price
+
+    # Track cross-market presence
+    present_markets = entry.get("present_markets", 0)
+    if new_price or used_price or amazon_price:
+        present_markets |= MARKET_BIT[market]
+    entry["present_markets"] = present_markets
+
+
+async def _do_batch(
+    client: KeepaClient,
+    batch: list[str],
+    market: str,
+    domain_id: int,
+    sem: asyncio.Semaphore,
+    bucket: KeepaTokenBucket | None,
+) -> list[dict]:
+    """Fetch one /product batch under the semaphore; [] on error.
+
+    With a bucket, the batch waits exactly as long as its token cost needs.
+    Without one, KeepaClient's own low-budget wait is the only pacing.
+    """
+    cost = len(batch) * PRODUCT_TOKEN_COST_PER_ASIN
+    if bucket:
+        await bucket.acquire(cost)
+    tokens_left = None
+    try:
+        async with sem:
+            products = []
+            try:
+                response = await client.get_products(batch, domain_id)
+                stats["tokens_consumed"] += response.get("metadata", {}).get(
+                    "tokens_consumed", 0
+                )
+                raw = response.get("raw", {})
+                tokens_left = raw.get("tokensLeft")
+                products = raw.get("products", [])
+            except Exception as e:
+                log.warning(f"  Batch validation error on {market}: {e}")
+                stats["errors"] += 1
+                # On rate limit: extra pause instead of blindly continuing
+                if "rate limit" in str(e).lower():
+                    log.info("    Rate limited — extra 30s pause")
+                    await asyncio.sleep(30)
+
+            return products
+    finally:
+        # Settle even when cancelled, so the cost stops counting as in flight
+        if bucket:
+            bucket.sync(tokens_left, cost)
+
+
 async def validate_asins(
-    client: KeepaClient, merged: dict[str, dict], target_domains: list[str]
+    client: KeepaClient,
+    merged: dict[str, dict],
+    target_domains: list[str],
+    concurrency: int = VALIDATE_CONCURRENCY,
+    bucket: KeepaTokenBucket | None = None,
 ) -> dict[str, dict]:
     """Batch-validate ASINs via Keepa /product for each target domain.
-    Uses adaptive batch-steering based on client.rate_limit_remaining."""
+    Paced by the token bucket synced from Keepa's tokensLeft.
+
+    Batches of all domains are fetched concurrently (at most `concurrency`
+    in flight) but merged in submission order, so entries end up exactly as
+    with one batch at a time: DE data first, then the other domains in order.
+    """
     log.info("Phase 3b: Keepa /product batch validation...")
 
     all_asins = list(merged.keys())
     batch_size = 20  # Was 50 → conservative to avoid 429 avalanche
+    sem = asyncio.Semaphore(max(1, concurrency))
 
+    jobs = []
     for market in target_domains:
         domain_id = DOMAINS.get(market)
         if domain_id is None:
@@ -372,115 +628,40 @@ async def validate_asins(
 
         for i in range(0, len(all_asins), batch_size):
             batch = all_asins[i : i + batch_size]
+            task = asyncio.create_task(
+                _do_batch(client, batch, market, domain_id, sem, bucket)
+            )
+            jobs.append((market, i + len(batch), task))
 
-            # Token-budget pre-check: pause if tokens are low
-            remaining = getattr(client, 'rate_limit_remaining', 100)
-            if remaining < 20:
-                reset_ms = getattr(client, 'rate_limit_reset', 15000)
-                wait_s = min(max(reset_ms / 1000, 5), 60)
-                log.info(f"    Pausing {wait_s:.0f}s — tokens low ({remaining})")
-                await asyncio.sleep(wait_s)
-
-            try:
-                response = await client.get_products(batch, domain_id)
-                stats["tokens_consumed"] += response.get("metadata", {}).get(
-                    "tokens_consumed", 0
-                )
-
-                products = response.get("raw", {}).get("products", [])
-
-                for product in products:
-                    asin = product.get("asin", "")
-                    if asin not in merged:
-                        continue
-
-                    entry = merged[asin]
-                    title = product.get("title", "")
-                    brand = product.get("brand", "")
-                    csv_data = product.get("csv") or []
-                    ean_list = product.get("eanList") or []
-                    sales_rank = product.get("salesRankReference")
-                    category_tree = product.get("categoryTree") or []
-                    description = product.get("description", "") or ""
-                    features_list = product.get("features") or []
-                    features_text = " ".join(features_list) if isinstance(features_list, list) else str(features_list)
-
-                    # Update with richer data
-                    if description:
-                        entry[f"description_{market}"] = description[:500]
-                        if not entry.get("description"):
-                            entry["description"] = description[:500]
-
-                    if features_text.strip():
-                        entry[f"features_{market}"] = features_text[:500]
-                        if not entry.get("features"):
-                            entry["features"] = features_text[:500]
-
-                    if title:
-                        entry[f"title_{market}"] = title[:200]
-                        if not entry.get("title"):
-                            entry["title"] = title[:200]
-
-                    if brand and not entry.get("brand"):
-                        entry["brand"] = brand
-
-                    if ean_list and not entry.get("ean"):
-                        entry["ean"] = ean_list[0]
-
-                    if sales_rank:
-                        entry[f"sales_rank_{market}"] = sales_rank
-
-                    # Prices for this market
-                    def get_price(idx):
-                        if (
-                            len(csv_data) > idx
-                            and csv_data[idx]
-                            and len(csv_data[idx]) >= 2
-                            and csv_data[idx][-1] > 0
-                        ):
-                            return csv_data[idx][-1] / 100.0
-                        return None
-
-                    new_price = get_price(1)
-                    used_price = get_price(2)
-                    amazon_price = get_price(0)
-
-                    entry[f"new_price_{market}"] = new_price or amazon_price
-                    entry[f"used_price_{market}"] = used_price
-
-                    # Track cross-market presence
-                    present_markets = entry.get("present_markets", set())
-                    if isinstance(present_markets, str):
-                        present_markets = set(present_markets.split(","))
-                    if new_price or used_price or amazon_price:
-                        present_markets.add(market)
-                    entry["present_markets"] = present_markets
-
-                    stats["validated"] += 1
-
-            except Exception as e:
-                log.warning(f"  Batch validation error on {market}: {e}")
-                stats["errors"] += 1
-                # On rate limit: extra pause instead of blindly continuing
-                if "rate limit" in str(e).lower():
-                    log.info("    Rate limited — extra 30s pause")
-                    await asyncio.sleep(30)
-
-            # Adaptive sleep based on token budget
-            remaining = getattr(client, 'rate_limit_remaining', 100)
-            if remaining > 50:
-                await asyncio.sleep(2)
-            elif remaining > 20:
-                await asyncio.sleep(5)
-            else:
-                await asyncio.sleep(15)
-
-            progress = min(i + batch_size, len(all_asins))
+    try:
+        for market, progress, task in jobs:
+            products = await task
+            # Only products for ASINs we asked about reach _apply_product
+            matched = (
+                (entry, product)
+                for product in products
+                if (entry := merged.get(product.get("asin", ""))) is not None
+            )
+            for entry, product in matched:
+                # One malformed product must not abort the other batches
+                try:
+                    _apply_product(entry, product, market)
+                except Exception as e:
+                    log.warning(
+                        f"  Product merge error on {market} "
+                        f"for {product.get('asin')}: {e}"
+                    )
+                    stats["errors"] += 1
+                    continue
+                stats["validated"] += 1
+
+            remaining = f"{bucket.tokens:.0f}" if bucket else "?"
             log.info(
                 f"    {market}: {progress}/{len(all_asins)} | tokens_left={remaining}"
             )
-
-        await asyncio.sleep(5)  # Was 3 → more breathing room between domains
+    finally:
+        for _, _, task in jobs:
+            task.cancel()
 
     return merged
 
@@ -490,77 +671,76 @@ async def validate_asins(
 
 def detect_layout_text(title: str) -> tuple[str | None, str]:
     """Layer 1: Detect layout from title keywords."""
-    title_lower = title.lower()
-    for layout, keywords in LAYOUT_TITLE_KEYWORDS.items():
-        for kw in keywords:
-            if kw in title_lower:
-                return layout, "title_keyword"
+    title_lower = _fold(title)
+    if _LAYOUT_AUTOMATON is not None:
+        best = None
+        for _, (rank, layout) in _LAYOUT_AUTOMATON.iter(title_lower):
+            if best is None or rank < best[0]:
+                best = (rank, layout)
+                if rank == 0:
+                    break
+        return (best[1], "title_keyword") if best else (None, "")
+    for layout, pattern in _LAYOUT_PATTERNS:
+        if pattern.search(title_lower):
+            return layout, "title_keyword"
     return None, ""
 
 
 def detect_layout_brand_model(title: str, brand: str) -> tuple[str | None, str]:
     """Layer 2: Detect layout from known QWERTZ brand+model combos."""
-    combined = f"{brand} {title}".lower()
-    for model in KNOWN_QWERTZ_MODELS:
-        if model in combined:
+    combined = _fold(f"{brand} {title}")
+    if _QWERTZ_MODEL_AUTOMATON is not None:
+        if next(_QWERTZ_MODEL_AUTOMATON.iter(combined), None) is not None:
             return "qwertz", "brand_model_db"
+        return None, ""
+    if _QWERTZ_MODEL_PATTERN.search(combined):
+        return "qwertz", "brand_model_db"
     return None, ""
 
 
 def detect_layout_ean(ean: str) -> tuple[str | None, str]:
     """Layer 3: EAN prefix 400-440 = German origin."""
-    if not ean or len(ean) < 3:
-        return None, ""
-    prefix = ean[:3]
-    try:
-        prefix_int = int(prefix)
-        if 400 <= prefix_int <= 440:
-            return "qwertz", "ean_prefix"
-    except ValueError:
-        pass
+    if ean and ean[:3] in DE_EAN_PREFIXES:
+        return "qwertz", "ean_prefix"
     return None, ""
 
 
-def detect_layout_cross_market(present_markets: set) -> tuple[str | None, str]:
+def detect_layout_cross_market(present_markets: int) -> tuple[str | None, str]:
     """Layer 4: Cross-market presence (DE + non-DE market)."""
-    if "DE" in present_markets and len(present_markets) > 1:
-        non_de = present_markets - {"DE"}
-        if non_de:
-            return "qwertz", "cross_market"
+    de_bit = MARKET_BIT["DE"]
+    if present_markets & de_bit and present_markets & ~de_bit:
+        return "qwertz", "cross_market"
     return None, ""
 
 
+def _variants(entry: dict, field: str, base: str) -> list[str]:
+    """base followed by each distinct non-empty f"{field}_{market}" value."""
+    variants = dict.fromkeys(
+        v for market in DOMAINS if (v := entry.get(f"{field}_{market}", ""))
+    )
+    variants.pop(base, None)
+    return [base, *variants]
+
+
 def detect_layout(entry: dict) -> dict:
     """Run multi-layer layout detection on a single entry."""
     title = entry.get("title", "")
     brand = entry.get("brand", "")
     ean = entry.get("ean", "")
-    present_markets = entry.get("present_markets", set())
-    if isinstance(present_markets, str):
-        present_markets = set(present_markets.split(",")) if present_markets else set()
-
-    # Also check market-specific titles
-    all_titles = [title]
-    for market in DOMAINS:
-        mt = entry.get(f"title_{market}", "")
-        if mt and mt not in all_titles:
-            all_titles.append(mt)
-
-    combined_title = " ".join(all_titles)
-
-    # Combine description + features from all markets
-    description = entry.get("description", "")
-    features = entry.get("features", "")
-    for market in DOMAINS:
-        desc_m = entry.get(f"description_{market}", "")
-        feat_m = entry.get(f"features_{market}", "")
-        if desc_m and desc_m not in description:
-            description += " " + desc_m
-        if feat_m and feat_m not in features:
-            features += " " + feat_m
-
-    # Layer 1 checks title + description + features
-    combined_text = combined_title + " " + description + " " + features
+    present_markets = entry.get("present_markets", 0)
+
+    # Also check market-specific titles, then description + features from
+    # all markets; each distinct market variant is appended once, in order
+    combined_title = " ".join(_variants(entry, "title", title))
+
+    # Layer 1 checks title + description + features, joined in one pass
+    combined_text = " ".join(
+        [
+            combined_title,
+            *_variants(entry, "description", entry.get("description", "")),
+            *_variants(entry, "features", entry.get("features", "")),
+        ]
+    )
 
     # Layer 1: Title/description/features keywords (high confidence)
     layout, layer = detect_layout_text(combined_text)
@@ -606,6 +786,16 @@ def run_layout_detection(
     log.info("Phase 3c: Multi-layer layout detection...")
 
     results = []
+    if not target_domains:
+        log.info("  No target domains — nothing to classify")
+        return results
+
+    target_set = set(target_domains)
+    target_mask = 0
+    for market in target_domains:
+        target_mask |= MARKET_BIT.get(market, 0)
+    # Target markets per present_markets & target_mask, built once per mask
+    markets_by_mask = {0: target_domains}
 
     for asin, entry in merged.items():
         detection = detect_layout(entry)
@@ -613,21 +803,28 @@ def run_layout_detection(
         detection_layer = detection["detection_layer"]
         confidence = detection["confidence"]
 
-        # For each target market, check mismatch
-        present_markets = entry.get("present_markets", set())
-        if isinstance(present_markets, str):
-            present_markets = set(present_markets.split(",")) if present_markets else set()
-
         # If we have market-specific data, use it
         entry_market = entry.get("market", "")
         if entry_market:
-            markets_to_check = [entry_market] if entry_market in target_domains else []
+            markets_to_check = (
+                [entry_market] if entry_market in target_set else target_domains
+            )
         else:
-            markets_to_check = [m for m in target_domains if m in present_markets]
-
-        # If no specific market, check all target domains
-        if not markets_to_check:
-            markets_to_check = target_domains
+            # If no specific market, check all target domains
+            hits = entry.get("present_markets", 0) & target_mask
+            markets_to_check = markets_by_mask.get(hits)
+            if markets_to_check is None:
+                markets_to_check = markets_by_mask[hits] = [
+                    m for m in target_domains if hits & MARKET_BIT.get(m, 0)
+                ]
+
+        # Undetected layout and no target market to place the entry in (its
+        # market is not a target, or it is present in none, e.g. unvalidated
+        # or validated on DE only): it can't mismatch anywhere, so only the
+        # row for the first target domain is kept. The dropped rows differ in
+        # per-market title, prices and expected_layout, but none is a mismatch.
+        if detected_layout == "unknown" and markets_to_check is target_domains:
+            markets_to_check = target_domains[:1]
 
         for market in markets_to_check:
             domain_id = DOMAINS.get(market, 0)
@@ -679,30 +876,33 @@ def run_layout_detection(
 # ===== Phase 3d: Output =====
 
 
+OUTPUT_FIELDS = [
+    "asin",
+    "domain_id",
+    "market",
+    "title",
+    "detected_layout",
+    "expected_layout",
+    "is_mismatch",
+    "confidence",
+    "detection_layer",
+    "new_price",
+    "used_price",
+    "brand",
+    "source",
+]
+_output_row = itemgetter(*OUTPUT_FIELDS)
+
+
 def write_output(results: list[dict], output_path: Path):
     """Write final results to CSV and JSON."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    fieldnames = [
-        "asin",
-        "domain_id",
-        "market",
-        "title",
-        "detected_layout",
-        "expected_layout",
-        "is_mismatch",
-        "confidence",
-        "detection_layer",
-        "new_price",
-        "used_price",
-        "brand",
-        "source",
-    ]
-
+    # Plain csv.writer over itemgetter tuples; no per-row DictWriter lookups
     with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results)
+        writer = csv.writer(f)
+        writer.writerow(OUTPUT_FIELDS)
+        writer.writerows(map(_output_row, results))
 
     log.info(f"Saved {len(results)} records to {output_path}")
 
@@ -732,7 +932,7 @@ def write_output(results: list[dict], output_path: Path):
         "mismatches": mismatches,
         "all_entries": results,
     }
-    json_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False, default=str))
+    json_path.write_bytes(json_dumps_pretty(payload, default=str))
     log.info(f"Saved JSON to {json_path}")
 
 
@@ -751,29 +951,30 @@ def _parse_float(val) -> float | None:
 # ===== Main =====
 
 
-async def check_token_budget(client: KeepaClient) -> int:
-    """Check available Keepa API tokens before starting validation."""
+async def check_token_budget(
+    client: KeepaClient, http: httpx.AsyncClient
+) -> dict | None:
+    """Check available Keepa API tokens before starting validation.
+
+    Returns the /token response (None on failure) to seed the token bucket.
+    """
     try:
-        import httpx as _httpx
-        async with _httpx.AsyncClient(timeout=10) as http:
-            resp = await http.get(
-                f"https://api.keepa.com/token?key={client.api_key}"
-            )
-            data = resp.json()
-            tokens = data.get("tokensLeft", 0)
-            refill = data.get("refillRate", 0)
-            refill_in = data.get("refillIn", 0)
-            log.info(f"  Token budget: {tokens} left, refill {refill}/min, next in {refill_in}ms")
-
-            if tokens < 50:
-                wait_s = min(refill_in / 1000, 120) if refill_in > 0 else 60
-                log.warning(f"  Low tokens ({tokens}) — waiting {wait_s:.0f}s for refill")
-                await asyncio.sleep(wait_s)
-
-            return tokens
+        resp = await http.get(
+            "https://api.keepa.com/token",
+            params={"key": client.api_key},
+            timeout=10,
+        )
+        data = resp.json()
+        tokens = data.get("tokensLeft", 0)
+        refill = data.get("refillRate", 0)
+        refill_in = data.get("refillIn", 0)
+        log.info(
+            f"  Token budget: {tokens} left, refill {refill}/min, next in {refill_in}ms"
+        )
+        return data
     except Exception as e:
         log.warning(f"  Token check failed: {e} — proceeding anyway")
-        return -1
+        return None
 
 
 async def run(args):
@@ -795,15 +996,28 @@ async def run(args):
             log.error("KEEPA_API_KEY not set. Use --skip-validation or set key.")
             sys.exit(1)
 
-        client = KeepaClient(api_key=api_key)
-
-        # Check token budget before starting
-        log.info("  Checking Keepa token budget...")
-        await check_token_budget(client)
+        # One pooled client for the whole run: the token check and all
+        # /product batches reuse its TCP+TLS connections
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE, timeout=30, limits=HTTP_LIMITS
+        ) as http:
+            client = KeepaClient(api_key=api_key, http_client=http)
+
+            # Check token budget before starting
+            log.info("  Checking Keepa token budget...")
+            bucket = KeepaTokenBucket.from_token_status(
+                await check_token_budget(client, http)
+            )
 
-        # Always include DE for baseline + target domains
-        validation_domains = list(dict.fromkeys(["DE"] + target_domains))
-        merged = await validate_asins(client, merged, validation_domains)
+            # Always include DE for baseline + target domains
+            validation_domains = list(dict.fromkeys(["DE"] + target_domains))
+            merged = await validate_asins(
+                client,
+                merged,
+                validation_domains,
+                concurrency=args.concurrency,
+                bucket=bucket,
+            )
     else:
         log.info("Phase 3b: SKIPPED (--skip-validation)")
 
@@ -829,6 +1043,12 @@ def main():
         action="store_true",
         help="Skip Keepa /product validation (just merge + detect layout)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=VALIDATE_CONCURRENCY,
+        help=f"Keepa /product batches in flight (default: {VALIDATE_CONCURRENCY})",
+    )
     parser.add_argument(
         "--domains",
         default="UK,FR,IT,ES",
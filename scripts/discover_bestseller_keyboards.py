@@ -19,14 +19,18 @@ Usage:
 import argparse
 import asyncio
 import csv
+import itertools
 import json
 import logging
 import os
 import sys
 import time
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 
+import httpx
 import importlib.util
 
 spec = importlib.util.spec_from_file_location(
@@ -37,6 +41,14 @@ keepa_client_module = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(keepa_client_module)
 KeepaClient = keepa_client_module.KeepaClient
 
+spec = importlib.util.spec_from_file_location(
+    "keepa_token_bucket_module",
+    Path(__file__).parent.parent / "src" / "services" / "keepa_token_bucket.py",
+)
+keepa_token_bucket_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(keepa_token_bucket_module)
+KeepaTokenBucket = keepa_token_bucket_module.KeepaTokenBucket
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s %(message)s",
@@ -63,56 +75,80 @@ FALLBACK_KEYBOARD_CATEGORIES = {
     9: [340843031],    # ES
 }
 
+OUTPUT_FIELDS = ["asin", "market", "domain_id", "source", "category_id"]
+_output_row = itemgetter(*OUTPUT_FIELDS)
+
+# Keepa requests in flight at once across all markets and categories
+DISCOVER_CONCURRENCY = 4
+
+# Estimated Keepa token cost per request, charged up front by the bucket;
+# the tokensLeft of each response corrects any difference
+CATEGORY_SEARCH_TOKEN_COST = 1
+BESTSELLER_TOKEN_COST = 50
+PRODUCT_FINDER_TOKEN_COST = 10  # plus 1 per 100 ASINs returned
+
+
+@lru_cache(maxsize=1)
+def _env_file_values() -> dict[str, str]:
+    """KEY=value pairs of the project .env, read once per process."""
+    env_file = PROJECT_ROOT / ".env"
+    if not env_file.exists():
+        return {}
+    values = {}
+    for line in env_file.read_text().splitlines():
+        if "=" in line and not line.startswith("#"):
+            key, value = line.split("=", 1)
+            values.setdefault(key, value)  # first definition wins
+    return values
+
 
 def get_api_key() -> str:
     api_key = os.environ.get("KEEPA_API_KEY", "")
     if not api_key:
-        env_file = PROJECT_ROOT / ".env"
-        if env_file.exists():
-            for line in env_file.read_text().splitlines():
-                if line.startswith("KEEPA_API_KEY="):
-                    return line.split("=", 1)[1].strip().strip('"').strip("'")
+        value = _env_file_values().get("KEEPA_API_KEY", "")
+        return value.strip().strip('"').strip("'")
     return api_key
 
 
 def load_existing_asins() -> set:
     """Load already-known ASINs to deduplicate against."""
     existing = set()
-    targets_path = PROJECT_ROOT / "data" / "keyboard_targets_1000.csv"
-    if targets_path.exists():
-        with open(targets_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                asin = row.get("asin", "").strip().upper()
-                if asin:
-                    existing.add(asin)
-        log.info(f"Loaded {len(existing)} existing ASINs for dedup")
-
-    # Also check other source files
-    for src_file in [
+    data_dir = PROJECT_ROOT / "data"
+
+    # Only the asin column matters: plain csv.reader, column located once
+    for src_file in (
+        "keyboard_targets_1000.csv",
         "keepa_search_qwertz.csv",
         "amazon_asins_raw.csv",
         "seed_best_sellers.csv",
-    ]:
-        src_path = PROJECT_ROOT / "data" / src_file
-        if src_path.exists():
-            with open(src_path, encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    asin = row.get("asin", "").strip().upper()
-                    if asin:
-                        existing.add(asin)
+    ):
+        src_path = data_dir / src_file
+        if not src_path.exists():
+            continue
+        with open(src_path, encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if "asin" not in header:
+                continue
+            idx = header.index("asin")
+            before = len(existing)
+            existing.update(
+                asin
+                for row in reader
+                if len(row) > idx and (asin := row[idx].strip().upper())
+            )
+        log.info(f"Loaded {len(existing) - before} new ASINs from {src_file}")
 
     # Check JSON seed file
-    json_path = PROJECT_ROOT / "data" / "seed_asins_eu_qwertz.json"
+    json_path = data_dir / "seed_asins_eu_qwertz.json"
     if json_path.exists():
         try:
             data = json.loads(json_path.read_text())
-            asin_list = data.get("all_asins", []) or data.get("asins", [])
-            if not asin_list and isinstance(data, list):
+            if isinstance(data, list):
                 asin_list = data
-            for asin in asin_list:
-                existing.add(asin.strip().upper())
+            else:
+                asin_list = data.get("all_asins", []) or data.get("asins", [])
+            existing.update(a.strip().upper() for a in asin_list if a)
         except Exception:
             pass
 
@@ -120,109 +156,190 @@ def load_existing_asins() -> set:
     return existing
 
 
-async def discover_categories(client: KeepaClient) -> dict:
-    """Step 1: Search for keyboard category IDs across all markets."""
-    log.info("Step 1: Searching for keyboard categories...")
-    categories_by_domain = {}
+async def check_token_budget(client: KeepaClient) -> dict | None:
+    """Fetch the key's /token status (None on failure) to seed the token bucket."""
+    try:
+        async with httpx.AsyncClient(timeout=10) as http:
+            resp = await http.get(
+                "https://api.keepa.com/token", params={"key": client.api_key}
+            )
+        data = resp.json()
+        log.info(
+            f"Token budget: {data.get('tokensLeft', 0)} left, "
+            f"refill {data.get('refillRate', 0)}/min"
+        )
+        return data
+    except Exception as e:
+        log.warning(f"Token check failed: {e} — pacing on tokensLeft only")
+        return None
 
-    for market, domain_id in DOMAINS.items():
+
+async def _wait_for_refill(raw: dict):
+    """Wait for Keepa's next refill when a response reports a low budget.
+
+    Fallback pacing when no token bucket could be seeded, driven by the
+    tokensLeft/refillIn every Keepa response carries.
+    """
+    tokens_left = raw.get("tokensLeft")
+    if tokens_left is not None and tokens_left < 10:
+        wait_s = raw.get("refillIn", 0) / 1000
+        log.info(f"  Tokens low ({tokens_left}), waiting {wait_s:.1f}s for refill...")
+        await asyncio.sleep(wait_s)
+
+
+async def _settle(raw: dict, bucket: KeepaTokenBucket | None, cost: int):
+    """Account for one Keepa request of ``cost`` tokens; raw is {} if it failed."""
+    if bucket:
+        bucket.sync(raw.get("tokensLeft"), cost)
+    else:
+        await _wait_for_refill(raw)
+
+
+def _asin_rows(
+    asin_list: list, market: str, domain_id: int, source: str, category_id: int
+) -> list[dict]:
+    """Output rows for the well-formed (10-char string) ASINs in asin_list."""
+    return [
+        {
+            "asin": asin.upper(),
+            "market": market,
+            "domain_id": domain_id,
+            "source": source,
+            "category_id": category_id,
+        }
+        for asin in asin_list
+        if isinstance(asin, str) and len(asin) == 10
+    ]
+
+
+async def _fetch_categories(
+    client: KeepaClient,
+    market: str,
+    domain_id: int,
+    sem: asyncio.Semaphore,
+    bucket: KeepaTokenBucket | None = None,
+) -> list[int]:
+    """Keyboard category IDs for one market, or the fallback list."""
+    async with sem:
+        if bucket:
+            await bucket.acquire(CATEGORY_SEARCH_TOKEN_COST)
+        response = {}
         try:
             response = await client.search_categories("keyboard", domain_id)
             cats = response.get("categories", {})
             if cats:
                 # Take top 3 most relevant categories
                 cat_ids = list(cats.keys())[:3]
-                categories_by_domain[domain_id] = [int(c) for c in cat_ids]
                 cat_names = [cats[c].get("name", c) for c in cat_ids[:3]]
                 log.info(f"  {market}: Found {len(cat_ids)} categories: {cat_names}")
+                result = [int(c) for c in cat_ids]
             else:
-                categories_by_domain[domain_id] = FALLBACK_KEYBOARD_CATEGORIES.get(
-                    domain_id, []
-                )
                 log.info(f"  {market}: No categories found, using fallback")
+                result = FALLBACK_KEYBOARD_CATEGORIES.get(domain_id, [])
         except Exception as e:
             log.warning(f"  {market}: Category search failed: {e}")
-            categories_by_domain[domain_id] = FALLBACK_KEYBOARD_CATEGORIES.get(
-                domain_id, []
-            )
+            result = FALLBACK_KEYBOARD_CATEGORIES.get(domain_id, [])
+        finally:
+            await _settle(response, bucket, CATEGORY_SEARCH_TOKEN_COST)
 
-        # Token-aware pause between markets
-        remaining = getattr(client, 'rate_limit_remaining', 100)
-        if remaining < 10:
-            log.info(f"  Tokens low ({remaining}), waiting 30s...")
-            await asyncio.sleep(30)
-        else:
-            await asyncio.sleep(2)
+        return result
 
-    return categories_by_domain
 
+async def discover_categories(
+    client: KeepaClient,
+    concurrency: int = DISCOVER_CONCURRENCY,
+    bucket: KeepaTokenBucket | None = None,
+) -> dict:
+    """Step 1: Search for keyboard category IDs across all markets."""
+    log.info("Step 1: Searching for keyboard categories...")
+    sem = asyncio.Semaphore(max(1, concurrency))
 
-async def discover_bestsellers(
-    client: KeepaClient, categories_by_domain: dict
-) -> list[dict]:
-    """Step 2: Fetch bestseller ASINs for each category per market."""
-    log.info("Step 2: Fetching bestseller ASINs...")
-    discovered = []
+    results = await asyncio.gather(
+        *(
+            _fetch_categories(client, market, domain_id, sem, bucket)
+            for market, domain_id in DOMAINS.items()
+        )
+    )
+    return dict(zip(DOMAINS.values(), results))
 
-    for market, domain_id in DOMAINS.items():
-        cat_ids = categories_by_domain.get(domain_id, [])
-        if not cat_ids:
-            log.info(f"  {market}: No categories, skipping")
-            continue
 
-        for cat_id in cat_ids:
-            try:
-                result = await client.get_bestsellers(domain_id, cat_id)
-                asin_list = result.get("raw", {}).get("bestSellersList") or []
-                tokens = result.get("metadata", {}).get("tokens_consumed", 0)
-
-                for asin in asin_list:
-                    if isinstance(asin, str) and len(asin) == 10:
-                        discovered.append(
-                            {
-                                "asin": asin.upper(),
-                                "market": market,
-                                "domain_id": domain_id,
-                                "source": "bestseller",
-                                "category_id": cat_id,
-                            }
-                        )
-
-                log.info(
-                    f"  {market} cat={cat_id}: {len(asin_list)} ASINs ({tokens} tokens)"
-                )
-            except Exception as e:
-                log.warning(f"  {market} cat={cat_id}: Bestseller fetch failed: {e}")
-                if "rate limit" in str(e).lower():
-                    log.info("    Rate limited — extra 30s pause")
-                    await asyncio.sleep(30)
-
-            # Token-aware pause between categories
-            remaining = getattr(client, 'rate_limit_remaining', 100)
-            if remaining < 10:
-                log.info(f"  Tokens low ({remaining}), waiting 30s...")
+async def _fetch_bestsellers(
+    client: KeepaClient,
+    market: str,
+    domain_id: int,
+    cat_id: int,
+    sem: asyncio.Semaphore,
+    bucket: KeepaTokenBucket | None = None,
+) -> list[dict]:
+    """Bestseller rows for one market/category; [] on error."""
+    async with sem:
+        if bucket:
+            await bucket.acquire(BESTSELLER_TOKEN_COST)
+        rows = []
+        raw = {}
+        try:
+            result = await client.get_bestsellers(domain_id, cat_id)
+            raw = result.get("raw", {})
+            asin_list = raw.get("bestSellersList") or []
+            tokens = result.get("metadata", {}).get("tokens_consumed", 0)
+            rows = _asin_rows(asin_list, market, domain_id, "bestseller", cat_id)
+            log.info(
+                f"  {market} cat={cat_id}: {len(asin_list)} ASINs ({tokens} tokens)"
+            )
+        except Exception as e:
+            log.warning(f"  {market} cat={cat_id}: Bestseller fetch failed: {e}")
+            if "rate limit" in str(e).lower():
+                log.info("    Rate limited — extra 30s pause")
                 await asyncio.sleep(30)
-            else:
-                await asyncio.sleep(2)
-
-        await asyncio.sleep(5)  # More breathing room between markets
+        finally:
+            await _settle(raw, bucket, BESTSELLER_TOKEN_COST)
 
-    return discovered
+        return rows
 
 
-async def discover_product_finder(
-    client: KeepaClient, categories_by_domain: dict
+async def discover_bestsellers(
+    client: KeepaClient,
+    categories_by_domain: dict,
+    concurrency: int = DISCOVER_CONCURRENCY,
+    bucket: KeepaTokenBucket | None = None,
 ) -> list[dict]:
-    """Step 3: Use Product Finder for targeted keyboard search."""
-    log.info("Step 3: Product Finder targeted search...")
-    discovered = []
+    """Step 2: Fetch bestseller ASINs for each category per market.
+
+    Up to `concurrency` category requests run at once; rows come back in
+    market/category order regardless of completion order.
+    """
+    log.info("Step 2: Fetching bestseller ASINs...")
+    sem = asyncio.Semaphore(max(1, concurrency))
 
+    tasks = []
     for market, domain_id in DOMAINS.items():
         cat_ids = categories_by_domain.get(domain_id, [])
-        root_cat = cat_ids[0] if cat_ids else None
-        if root_cat is None:
+        if not cat_ids:
+            log.info(f"  {market}: No categories, skipping")
             continue
-
+        tasks.extend(
+            _fetch_bestsellers(client, market, domain_id, cat_id, sem, bucket)
+            for cat_id in cat_ids
+        )
+
+    results = await asyncio.gather(*tasks)
+    return [row for rows in results for row in rows]
+
+
+async def _fetch_product_finder(
+    client: KeepaClient,
+    market: str,
+    domain_id: int,
+    root_cat: int,
+    sem: asyncio.Semaphore,
+    bucket: KeepaTokenBucket | None = None,
+) -> list[dict]:
+    """Product Finder rows for one market's root category; [] on error."""
+    async with sem:
+        if bucket:
+            await bucket.acquire(PRODUCT_FINDER_TOKEN_COST)
+        rows = []
+        raw = {}
         try:
             parms = {
                 "productType": [0],  # Standard products
@@ -231,21 +348,10 @@ async def discover_product_finder(
                 "hasReviews": True,
             }
             result = await client.product_finder(domain_id, parms)
-            asin_list = result.get("raw", {}).get("asinList") or []
+            raw = result.get("raw", {})
+            asin_list = raw.get("asinList") or []
             tokens = result.get("metadata", {}).get("tokens_consumed", 0)
-
-            for asin in asin_list:
-                if isinstance(asin, str) and len(asin) == 10:
-                    discovered.append(
-                        {
-                            "asin": asin.upper(),
-                            "market": market,
-                            "domain_id": domain_id,
-                            "source": "product_finder",
-                            "category_id": root_cat,
-                        }
-                    )
-
+            rows = _asin_rows(asin_list, market, domain_id, "product_finder", root_cat)
             log.info(
                 f"  {market}: Product Finder returned {len(asin_list)} ASINs ({tokens} tokens)"
             )
@@ -254,16 +360,30 @@ async def discover_product_finder(
             if "rate limit" in str(e).lower():
                 log.info("    Rate limited — extra 30s pause")
                 await asyncio.sleep(30)
+        finally:
+            await _settle(raw, bucket, PRODUCT_FINDER_TOKEN_COST)
 
-        # Token-aware pause between markets
-        remaining = getattr(client, 'rate_limit_remaining', 100)
-        if remaining < 10:
-            log.info(f"  Tokens low ({remaining}), waiting 30s...")
-            await asyncio.sleep(30)
-        else:
-            await asyncio.sleep(3)
+        return rows
 
-    return discovered
+
+async def discover_product_finder(
+    client: KeepaClient,
+    categories_by_domain: dict,
+    concurrency: int = DISCOVER_CONCURRENCY,
+    bucket: KeepaTokenBucket | None = None,
+) -> list[dict]:
+    """Step 3: Use Product Finder for targeted keyboard search."""
+    log.info("Step 3: Product Finder targeted search...")
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    results = await asyncio.gather(
+        *(
+            _fetch_product_finder(client, market, domain_id, cat_ids[0], sem, bucket)
+            for market, domain_id in DOMAINS.items()
+            if (cat_ids := categories_by_domain.get(domain_id, []))
+        )
+    )
+    return [row for rows in results for row in rows]
 
 
 async def run(args):
@@ -277,24 +397,28 @@ async def run(args):
     # Load existing ASINs for dedup
     existing_asins = load_existing_asins()
 
+    # Every request is paced against the key's token budget and refill rate
+    bucket = KeepaTokenBucket.from_token_status(await check_token_budget(client))
+
     # Step 1: Discover categories
-    categories = await discover_categories(client)
+    categories = await discover_categories(client, args.concurrency, bucket)
 
     # Step 2: Bestsellers
-    bestseller_asins = await discover_bestsellers(client, categories)
+    bestseller_asins = await discover_bestsellers(
+        client, categories, args.concurrency, bucket
+    )
     log.info(f"Bestsellers: {len(bestseller_asins)} total ASINs discovered")
 
     # Step 3: Product Finder
-    finder_asins = await discover_product_finder(client, categories)
+    finder_asins = await discover_product_finder(
+        client, categories, args.concurrency, bucket
+    )
     log.info(f"Product Finder: {len(finder_asins)} total ASINs discovered")
 
-    # Combine and dedup
-    all_discovered = bestseller_asins + finder_asins
+    # Combine and dedup in one pass; the first occurrence of an ASIN wins
     seen = {}
-    for entry in all_discovered:
-        asin = entry["asin"]
-        if asin not in seen:
-            seen[asin] = entry
+    for entry in itertools.chain(bestseller_asins, finder_asins):
+        seen.setdefault(entry["asin"], entry)
 
     total_unique = len(seen)
     new_asins = {k: v for k, v in seen.items() if k not in existing_asins}
@@ -308,11 +432,11 @@ async def run(args):
     output_path = PROJECT_ROOT / "data" / "keepa_bestsellers_keyboards.csv"
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    fieldnames = ["asin", "market", "domain_id", "source", "category_id"]
+    # Plain csv.writer over itemgetter tuples; no per-row DictWriter lookups
     with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(new_asins.values())
+        writer = csv.writer(f)
+        writer.writerow(OUTPUT_FIELDS)
+        writer.writerows(map(_output_row, new_asins.values()))
 
     log.info(f"Saved {len(new_asins)} new ASINs to {output_path}")
 
@@ -353,6 +477,12 @@ def main():
         action="store_true",
         help="Don't write output files, just show what would be found",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DISCOVER_CONCURRENCY,
+        help="Max Keepa requests in flight at once",
+    )
     args = parser.parse_args()
 
     log.info("Keepa Bestseller + Product Finder Discovery")
@@ -1,18 +1,30 @@
 from src.services.notification import notification_service
+from collections import OrderedDict, defaultdict, deque
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import asyncio
-import re
+import random
+import time
 
 
 class AlertDispatcherAgent:
     MAX_ALERTS_PER_HOUR = 10
+    RATE_LIMIT_WINDOW_S = 3600.0
     DUPLICATE_WINDOW = timedelta(hours=1)
+    DUPLICATE_WINDOW_S = DUPLICATE_WINDOW.total_seconds()
     MAX_RETRIES = 3
-    RETRY_DELAYS = [0, 30, 120]
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 60.0
+    TRANSIENT_ERROR_CODES = frozenset({429, 502, 503, 529})
+    MAX_TRACKED_ALERTS = 100_000
+    BATCH_CONCURRENCY = 8
 
     def __init__(self):
-        self.sent_alerts = {}
+        # key -> last sent time.monotonic(), oldest first; pruned to the
+        # duplicate window
+        self.sent_alerts = OrderedDict()
+        # user_id -> time.monotonic() of each alert delivered, oldest first
+        self._user_sends = defaultdict(deque)
 
     def validate_alert_input(self, alert: Dict[str, Any]) -> tuple:
         if not alert.get("user_id"):
@@ -34,14 +46,29 @@ class AlertDispatcherAgent:
         key = f"{user_id}_{asin}_{channel}"
         last_sent = self.sent_alerts.get(key)
 
-        if last_sent and (datetime.utcnow() - last_sent) < self.DUPLICATE_WINDOW:
+        if (
+            last_sent is not None
+            and time.monotonic() - last_sent < self.DUPLICATE_WINDOW_S
+        ):
             return True
 
         return False
 
     def mark_alert_sent(self, user_id: str, asin: str, channel: str):
         key = f"{user_id}_{asin}_{channel}"
-        self.sent_alerts[key] = datetime.utcnow()
+        now = time.monotonic()
+        self.sent_alerts[key] = now
+        self.sent_alerts.move_to_end(key)
+
+        # Entries leave the window in insertion order: drop expired ones from
+        # the front, and the oldest beyond the size cap
+        cutoff = now - self.DUPLICATE_WINDOW_S
+        alerts = self.sent_alerts
+        while alerts and (
+            len(alerts) > self.MAX_TRACKED_ALERTS
+            or next(iter(alerts.values())) < cutoff
+        ):
+            alerts.popitem(last=False)
 
     def format_alert(
         self, alert: Dict[str, Any], channel: str = "email"
@@ -54,19 +81,36 @@ class AlertDispatcherAgent:
             channel=channel,
         )
 
+    def record_alert_sent(self, user_id: str):
+        self._user_sends[user_id].append(time.monotonic())
+
+    def _recent_send_count(self, user_id: str) -> int:
+        sends = self._user_sends.get(user_id)
+        if not sends:
+            return 0
+        # Sends are appended in time order: expire from the left only
+        cutoff = time.monotonic() - self.RATE_LIMIT_WINDOW_S
+        while sends and sends[0] < cutoff:
+            sends.popleft()
+        if not sends:
+            del self._user_sends[user_id]
+        return len(sends)
+
     def check_rate_limit(
-        self, user_id: str, recent_alerts: List[Dict]
+        self, user_id: str, recent_alerts: Optional[List[Dict]] = None
     ) -> Dict[str, Any]:
-        hour_ago = datetime.utcnow() - timedelta(hours=1)
-        recent_count = len(
-            [
-                a
+        if recent_alerts is None:
+            recent_count = self._recent_send_count(user_id)
+        else:
+            # Caller-supplied history (ISO sent_at strings): full scan
+            hour_ago = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+            recent_count = sum(
+                1
                 for a in recent_alerts
                 if a.get("user_id") == user_id
                 and a.get("sent_at")
-                and a["sent_at"] > hour_ago.isoformat()
-            ]
-        )
+                and a["sent_at"] > hour_ago
+            )
 
         if recent_count >= self.MAX_ALERTS_PER_HOUR:
             return {
@@ -77,10 +121,30 @@ class AlertDispatcherAgent:
 
         return {"exceeded": False, "remaining": self.MAX_ALERTS_PER_HOUR - recent_count}
 
+    def is_transient_failure(self, result: Dict[str, Any]) -> bool:
+        """Whether a failed send is worth retrying (throttling / upstream outage)."""
+        if result.get("error_code") in self.TRANSIENT_ERROR_CODES:
+            return True
+        return "rate limit" in str(result.get("error", "")).lower()
+
+    def retry_delay(self, retry: int, result: Dict[str, Any]) -> float:
+        """Exponential backoff with jitter, never shorter than a retry_after hint."""
+        delay = min(
+            self.RETRY_MAX_DELAY,
+            self.RETRY_BASE_DELAY * 2**retry + random.uniform(0, self.RETRY_BASE_DELAY),
+        )
+        if result.get("retry_after") is not None:
+            delay = max(delay, float(result["retry_after"]))
+        return delay
+
     async def send_alert(
-        self, alert: Dict[str, Any], channel: str = "email"
+        self,
+        alert: Dict[str, Any],
+        channel: str = "email",
+        formatted: Optional[Dict[str, str]] = None,
     ) -> Dict[str, Any]:
-        formatted = self.format_alert(alert, channel)
+        if formatted is None:
+            formatted = self.format_alert(alert, channel)
 
         if channel == "email":
             to_addr = alert.get("email") or "user@example.com"
@@ -101,6 +165,27 @@ class AlertDispatcherAgent:
 
         return {"success": False, "error": f"Channel {channel} not implemented"}
 
+    async def _send_with_retry(
+        self, alert: Dict[str, Any], channel: str, user_id: str, asin: str
+    ) -> Dict[str, Any]:
+        # Rendered once per channel and reused by every retry
+        formatted = self.format_alert(alert, channel)
+        result = await self.send_alert(alert, channel, formatted)
+
+        if result.get("success"):
+            self.mark_alert_sent(user_id, asin, channel)
+            return {"success": True, "messageId": result.get("messageId")}
+
+        for retry in range(self.MAX_RETRIES):
+            if not self.is_transient_failure(result):
+                break
+            await asyncio.sleep(self.retry_delay(retry, result))
+            result = await self.send_alert(alert, channel, formatted)
+            if result.get("success"):
+                break
+
+        return result
+
     async def dispatch_alert(
         self, alert: Dict[str, Any], channels: List[str] = None
     ) -> Dict[str, Any]:
@@ -114,34 +199,39 @@ class AlertDispatcherAgent:
         user_id = alert.get("user_id", "unknown")
         asin = alert.get("asin", "unknown")
 
-        results = {}
-        for channel in channels:
-            if self.is_duplicate_alert(user_id, asin, channel):
-                results[channel] = {
-                    "success": True,
-                    "skipped": True,
-                    "reason": "Duplicate alert",
-                }
-                continue
-
-            result = await self.send_alert(alert, channel)
+        # Duplicate check runs up front, before any send can mark a channel
+        unique_channels = list(dict.fromkeys(channels))
+        duplicates = {
+            channel
+            for channel in unique_channels
+            if self.is_duplicate_alert(user_id, asin, channel)
+        }
+        to_send = [ch for ch in unique_channels if ch not in duplicates]
 
-            if result.get("success"):
-                self.mark_alert_sent(user_id, asin, channel)
-                results[channel] = {
-                    "success": True,
-                    "messageId": result.get("messageId"),
-                }
+        # Channels are independent: send to all of them concurrently
+        sent = await asyncio.gather(
+            *(self._send_with_retry(alert, ch, user_id, asin) for ch in to_send),
+            return_exceptions=True,
+        )
+        sent_results: Dict[str, Dict[str, Any]] = {}
+        for channel, outcome in zip(to_send, sent):
+            if isinstance(outcome, BaseException):
+                sent_results[channel] = {"success": False, "error": str(outcome)}
             else:
-                for retry in range(self.MAX_RETRIES):
-                    await asyncio.sleep(self.RETRY_DELAYS[retry])
-                    result = await self.send_alert(alert, channel)
-                    if result.get("success"):
-                        break
+                sent_results[channel] = outcome
 
-                results[channel] = result
+        results: Dict[str, Dict[str, Any]] = {
+            channel: (
+                {"success": True, "skipped": True, "reason": "Duplicate alert"}
+                if channel in duplicates
+                else sent_results[channel]
+            )
+            for channel in unique_channels
+        }
 
         overall_success = any(r.get("success") for r in results.values())
+        if any(r.get("success") and not r.get("skipped") for r in results.values()):
+            self.record_alert_sent(user_id)
 
         return {
             "success": overall_success,
@@ -152,13 +242,25 @@ class AlertDispatcherAgent:
     async def dispatch_batch(
         self, alerts: List[Dict[str, Any]], user_id: str
     ) -> Dict[str, Any]:
+        sem = asyncio.Semaphore(self.BATCH_CONCURRENCY)
+        # Alerts for the same user/product run in order, so the duplicate
+        # check still sees the sends of earlier alerts in the batch
+        key_locks: defaultdict[tuple[Optional[str], Optional[str]], asyncio.Lock] = (
+            defaultdict(asyncio.Lock)
+        )
+
+        async def dispatch_one(alert: Dict[str, Any]) -> Dict[str, Any]:
+            key = (alert.get("user_id"), alert.get("asin"))
+            async with key_locks[key], sem:
+                return await self.dispatch_alert(alert)
+
+        results = await asyncio.gather(*(dispatch_one(alert) for alert in alerts))
+
         sent = 0
         failed = 0
         skipped = 0
 
-        for alert in alerts:
-            result = await self.dispatch_alert(alert)
-
+        for result in results:
             if result.get("success"):
                 if result.get("channel_results", {}).get("email", {}).get("skipped"):
                     skipped += 1
@@ -7,9 +7,10 @@ import asyncio
 import hashlib
 import logging
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import AsyncIterator, Optional
 from uuid import uuid4
 import sys
 from pathlib import Path
@@ -104,8 +105,20 @@ class KeepaClient:
     Handles authentication, rate limiting, and response parsing
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Args:
+            api_key: Keepa API key (defaults to the configured key)
+            http_client: Shared AsyncClient whose connection pool is reused
+                across requests; the caller owns and closes it. Without one,
+                every request opens and closes its own client.
+        """
         self.api_key = api_key or get_keepa_api_key()
+        self._http_client = http_client
         self.api_key_hash = self._hash_api_key(self.api_key)
         self.rate_limit_remaining: int = 100
         self.rate_limit_reset: Optional[int] = None
@@ -151,6 +164,15 @@ class KeepaClient:
         except Exception:
             pass
 
+    @asynccontextmanager
+    async def _client(self, timeout: float) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield the shared HTTP client, or a short-lived one if none was given."""
+        if self._http_client is not None:
+            yield self._http_client
+            return
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            yield client
+
     async def _make_request(
         self, endpoint: str, params: dict, timeout: float = 30.0, method: str = "GET"
     ) -> dict:
@@ -171,11 +193,11 @@ class KeepaClient:
             )
             await asyncio.sleep(wait_s)
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
+        async with self._client(timeout) as client:
             if method == "POST":
-                response = await client.post(url, data=params)
+                response = await client.post(url, data=params, timeout=timeout)
             else:
-                response = await client.get(url, params=params)
+                response = await client.get(url, params=params, timeout=timeout)
 
             # Update rate limit info from response headers
             self.rate_limit_remaining = int(
@@ -0,0 +1,69 @@
+"""
+Keepa Token Bucket
+==================
+Client-side pacing against a Keepa API key's token budget, shared by the
+discovery and collection scripts.
+"""
+
+import asyncio
+import time
+
+
+class KeepaTokenBucket:
+    """Async token bucket mirroring the Keepa key's token budget.
+
+    Seeded from the /token response and re-synced from ``tokensLeft`` on every
+    API response, so estimation drift corrects itself. Requests only wait when
+    the budget is actually exhausted instead of sleeping a fixed interval.
+
+    Every ``acquire`` must be matched by one ``sync`` for the same cost once
+    the request is answered (or has failed). Until then its cost counts as in
+    flight: ``tokensLeft`` does not reflect it yet, so a sync keeps it deducted.
+    """
+
+    def __init__(self, tokens: float, refill_per_minute: float):
+        self.refill_per_second = refill_per_minute / 60.0
+        # Keepa tokens expire after an hour, so the balance never exceeds this
+        self.capacity = max(tokens, refill_per_minute * 60)
+        self.tokens = float(tokens)
+        self.in_flight = 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_token_status(cls, data: dict | None) -> "KeepaTokenBucket | None":
+        """Build a bucket from a /token response, or None if it is unavailable."""
+        if not data or not data.get("refillRate"):
+            return None
+        return cls(data.get("tokensLeft", 0), data["refillRate"])
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self._updated) * self.refill_per_second,
+        )
+        self._updated = now
+
+    async def acquire(self, cost: float) -> None:
+        """Wait until ``cost`` tokens are available, then deduct them."""
+        cost = min(cost, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < cost:
+                await asyncio.sleep((cost - self.tokens) / self.refill_per_second)
+                self._refill()
+            self.tokens -= cost
+            self.in_flight += cost
+
+    def sync(self, tokens_left, cost: float) -> None:
+        """Settle an acquired request of ``cost`` and realign with ``tokensLeft``.
+
+        ``tokens_left`` is None when the request failed; the local deduction
+        then stands until the next answered request corrects it.
+        """
+        self.in_flight = max(0.0, self.in_flight - min(cost, self.capacity))
+        if tokens_left is None:
+            return
+        self.tokens = min(self.capacity, float(tokens_left) - self.in_flight)
+        self._updated = time.monotonic()
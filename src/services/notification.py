@@ -8,6 +8,16 @@ import httpx
 from src.config import get_settings
 
 
+def _http_failure(resp: httpx.Response) -> Dict[str, Any]:
+    """Failed-send result with the status code and any Retry-After seconds."""
+    result = {"success": False, "error": resp.text, "error_code": resp.status_code}
+    try:
+        result["retry_after"] = float(resp.headers["Retry-After"])
+    except (KeyError, ValueError):
+        pass
+    return result
+
+
 class NotificationService:
     def __init__(self):
         self.settings = get_settings()
@@ -158,7 +168,7 @@ Keeper Team
                 if resp.status_code == 200 and resp.json().get("ok"):
                     msg_id = resp.json().get("result", {}).get("message_id")
                     return {"success": True, "messageId": f"tg_{msg_id}"}
-                return {"success": False, "error": resp.text}
+                return _http_failure(resp)
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -174,7 +184,7 @@ Keeper Team
                         "success": True,
                         "messageId": f"dc_{datetime.utcnow().timestamp()}",
                     }
-                return {"success": False, "error": resp.text}
+                return _http_failure(resp)
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -0,0 +1,52 @@
+"""
+JSON Codec
+==========
+Bytes-in/bytes-out JSON helpers for the discovery and collection scripts.
+Uses orjson when it is installed and the stdlib json module otherwise.
+
+The output of the two backends is not byte-identical:
+    - datetimes: orjson writes "2024-01-01T12:00:00" natively; stdlib json
+      only serializes them via ``default`` (str() gives a space, not "T")
+    - NaN/Infinity: orjson writes null, stdlib json writes NaN/Infinity
+    - float exponents: orjson writes 1e20 and 1e-7, stdlib 1e+20 and 1e-07
+Non-str dict keys are stringified by both (OPT_NON_STR_KEYS for orjson).
+"""
+
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None  # type: ignore
+
+
+def json_loads(data: bytes) -> Any:
+    """Parse a JSON document from bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        obj, separators=(",", ":"), ensure_ascii=False, default=default
+    ).encode("utf-8")
+
+
+def json_dumps_pretty(
+    obj: Any, default: Optional[Callable[[Any], Any]] = None
+) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes indented by two spaces."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=default).encode(
+        "utf-8"
+    )
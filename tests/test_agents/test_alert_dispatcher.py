@@ -1,4 +1,6 @@
+import asyncio
 import pytest
+import time
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch, MagicMock
 from src.agents.alert_dispatcher import AlertDispatcherAgent, alert_dispatcher
@@ -38,8 +40,10 @@ class TestAlertDispatcherInit:
     def test_init_default_constants(self, agent):
         assert agent.MAX_ALERTS_PER_HOUR == 10
         assert agent.DUPLICATE_WINDOW == timedelta(hours=1)
+        assert agent.DUPLICATE_WINDOW_S == 3600
         assert agent.MAX_RETRIES == 3
-        assert agent.RETRY_DELAYS == [0, 30, 120]
+        assert agent.RETRY_BASE_DELAY == 1.0
+        assert agent.RETRY_MAX_DELAY == 60.0
 
 
 class TestValidateAlertInput:
@@ -91,7 +95,7 @@ class TestIsDuplicateAlert:
         asin = "B08N5WRWNW"
         channel = "email"
 
-        old_time = datetime.utcnow() - timedelta(hours=2)
+        old_time = time.monotonic() - 2 * 3600
         agent.sent_alerts[f"{user_id}_{asin}_{channel}"] = old_time
 
         result = agent.is_duplicate_alert(user_id, asin, channel)
@@ -112,7 +116,23 @@ class TestMarkAlertSent:
 
         key = f"{user_id}_{asin}_{channel}"
         assert key in agent.sent_alerts
-        assert isinstance(agent.sent_alerts[key], datetime)
+        assert isinstance(agent.sent_alerts[key], float)
+
+    def test_mark_alert_sent_prunes_expired_entries(self, agent):
+        agent.sent_alerts["old_B1_email"] = time.monotonic() - 2 * 3600
+
+        agent.mark_alert_sent("user123", "B08N5WRWNW", "email")
+
+        assert "old_B1_email" not in agent.sent_alerts
+        assert list(agent.sent_alerts) == ["user123_B08N5WRWNW_email"]
+
+    def test_mark_alert_sent_caps_tracked_alerts(self, agent):
+        agent.MAX_TRACKED_ALERTS = 2
+
+        for asin in ("B1", "B2", "B3"):
+            agent.mark_alert_sent("user123", asin, "email")
+
+        assert list(agent.sent_alerts) == ["user123_B2_email", "user123_B3_email"]
 
 
 class TestFormatAlert:
@@ -165,6 +185,26 @@ class TestCheckRateLimit:
         assert result["exceeded"] is True
         assert "Rate limit exceeded" in result["message"]
 
+    def test_check_rate_limit_uses_tracked_sends(self, agent):
+        for _ in range(agent.MAX_ALERTS_PER_HOUR - 1):
+            agent.record_alert_sent("user123")
+
+        assert agent.check_rate_limit("user123")["remaining"] == 1
+        agent.record_alert_sent("user123")
+        assert agent.check_rate_limit("user123")["exceeded"] is True
+        assert agent.check_rate_limit("other_user")["remaining"] == 10
+
+    def test_check_rate_limit_expires_old_sends(self, agent):
+        old = time.monotonic() - agent.RATE_LIMIT_WINDOW_S - 1
+        agent._user_sends["user123"].extend([old] * 12)
+        agent.record_alert_sent("user123")
+
+        result = agent.check_rate_limit("user123")
+
+        assert result["exceeded"] is False
+        assert result["remaining"] == 9
+        assert len(agent._user_sends["user123"]) == 1
+
 
 class TestSendAlert:
     @pytest.mark.asyncio
@@ -253,6 +293,49 @@ class TestDispatchAlert:
             assert "telegram" in result["channel_results"]
             assert "discord" in result["channel_results"]
 
+    @pytest.mark.asyncio
+    async def test_dispatch_alert_channel_error_does_not_block_others(
+        self, agent, sample_alert
+    ):
+        alert = sample_alert.copy()
+        alert["channels"] = ["email", "telegram"]
+        alert["telegram_chat_id"] = "123"
+
+        with patch("src.agents.alert_dispatcher.notification_service") as mock_service:
+            mock_service.format_price_alert = MagicMock(
+                return_value={"subject": "Alert", "body": "Body"}
+            )
+            mock_service.send_email = AsyncMock(side_effect=RuntimeError("SMTP down"))
+            mock_service.send_telegram = AsyncMock(return_value={"success": True})
+
+            result = await agent.dispatch_alert(alert)
+
+            assert result["success"] is True
+            assert list(result["channel_results"]) == ["email", "telegram"]
+            assert result["channel_results"]["email"]["success"] is False
+            assert "SMTP down" in result["channel_results"]["email"]["error"]
+            assert result["channel_results"]["telegram"]["success"] is True
+
+    @pytest.mark.asyncio
+    async def test_dispatch_alert_cancelled_send_is_reported_as_failure(
+        self, agent, sample_alert
+    ):
+        alert = sample_alert.copy()
+        alert["channels"] = ["email", "telegram"]
+        alert["telegram_chat_id"] = "123"
+
+        with patch("src.agents.alert_dispatcher.notification_service") as mock_service:
+            mock_service.format_price_alert = MagicMock(
+                return_value={"subject": "Alert", "body": "Body"}
+            )
+            mock_service.send_email = AsyncMock(side_effect=asyncio.CancelledError())
+            mock_service.send_telegram = AsyncMock(return_value={"success": True})
+
+            result = await agent.dispatch_alert(alert)
+
+            assert result["channel_results"]["email"]["success"] is False
+            assert result["channel_results"]["telegram"]["success"] is True
+
     @pytest.mark.asyncio
     async def test_dispatch_alert_handles_failure_with_retry(self, agent, sample_alert):
         with patch("src.agents.alert_dispatcher.notification_service") as mock_service, \
@@ -261,13 +344,67 @@ class TestDispatchAlert:
                 return_value={"subject": "Alert", "body": "Body"}
             )
             mock_service.send_email = AsyncMock(
-                return_value={"success": False, "error": "Failed"}
+                return_value={"success": False, "error": "Rate limit exceeded"}
             )
 
             result = await agent.dispatch_alert(sample_alert, ["email"])
 
-            assert mock_service.send_email.call_count >= 1
-            assert mock_sleep.call_count >= 1
+            assert mock_service.send_email.call_count == 1 + agent.MAX_RETRIES
+            assert mock_sleep.call_count == agent.MAX_RETRIES
+            mock_service.format_price_alert.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_dispatch_alert_does_not_retry_permanent_failure(
+        self, agent, sample_alert
+    ):
+        with patch("src.agents.alert_dispatcher.notification_service") as mock_service, \
+             patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            mock_service.format_price_alert = MagicMock(
+                return_value={"subject": "Alert", "body": "Body"}
+            )
+            mock_service.send_email = AsyncMock(
+                return_value={"success": False, "error": "Failed", "error_code": 400}
+            )
+
+            result = await agent.dispatch_alert(sample_alert, ["email"])
+
+            assert result["success"] is False
+            assert mock_service.send_email.call_count == 1
+            mock_sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dispatch_alert_honors_retry_after(self, agent, sample_alert):
+        with patch("src.agents.alert_dispatcher.notification_service") as mock_service, \
+             patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            mock_service.format_price_alert = MagicMock(
+                return_value={"subject": "Alert", "body": "Body"}
+            )
+            mock_service.send_email = AsyncMock(
+                side_effect=[
+                    {"success": False, "error_code": 429, "retry_after": 42},
+                    {"success": True, "messageId": "123"},
+                ]
+            )
+
+            result = await agent.dispatch_alert(sample_alert, ["email"])
+
+            assert result["success"] is True
+            mock_sleep.assert_awaited_once_with(42.0)
+
+
+class TestRetryDelay:
+    def test_retry_delay_grows_exponentially_within_cap(self, agent):
+        for retry in range(10):
+            delay = agent.retry_delay(retry, {})
+            base = agent.RETRY_BASE_DELAY * 2**retry
+            assert min(base, agent.RETRY_MAX_DELAY) <= delay <= agent.RETRY_MAX_DELAY
+            assert delay <= base + agent.RETRY_BASE_DELAY
+
+    def test_is_transient_failure(self, agent):
+        assert agent.is_transient_failure({"error_code": 503}) is True
+        assert agent.is_transient_failure({"error": "Rate limit hit"}) is True
+        permanent = {"error": "Bad Request", "error_code": 400}
+        assert agent.is_transient_failure(permanent) is False
 
 
 class TestDispatchBatch:
@@ -286,6 +423,22 @@ class TestDispatchBatch:
             assert result["total"] == 3
             assert result["sent"] + result["failed"] + result["skipped"] == 3
 
+    @pytest.mark.asyncio
+    async def test_dispatch_batch_sends_repeated_alert_once(self, agent, sample_alert):
+        alerts = [sample_alert.copy() for _ in range(3)]
+
+        with patch("src.agents.alert_dispatcher.notification_service") as mock_service:
+            mock_service.format_price_alert = MagicMock(
+                return_value={"subject": "Alert", "body": "Body"}
+            )
+            mock_service.send_email = AsyncMock(return_value={"success": True})
+
+            result = await agent.dispatch_batch(alerts, "user456")
+
+            mock_service.send_email.assert_called_once()
+            assert result["sent"] == 1
+            assert result["skipped"] == 2
+
     @pytest.mark.asyncio
     async def test_dispatch_batch_handles_empty_list(self, agent):
         result = await agent.dispatch_batch([], "user123")
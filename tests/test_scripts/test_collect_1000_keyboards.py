@@ -0,0 +1,182 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from src.services.keepa_token_bucket import KeepaTokenBucket
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "collect_1000_keyboards.py"
+
+spec = importlib.util.spec_from_file_location("collect_1000_keyboards", SCRIPT)
+collect = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(collect)
+
+PRICED_CSV = [[1, 2999], [1, 3999], [1, -1]]
+DE, UK, FR = (collect.MARKET_BIT[m] for m in ("DE", "UK", "FR"))
+
+
+class FakeKeepaClient:
+    """Keepa stand-in returning a fixed /product record per (domain, asin)."""
+
+    def __init__(self, products: dict, delay=None, tokens_left=None):
+        self.products = products
+        self.delay = delay or {}
+        self.tokens_left = tokens_left
+
+    async def get_products(self, batch, domain_id):
+        await asyncio.sleep(self.delay.get(domain_id, 0))
+        found = [
+            self.products[(domain_id, asin)]
+            for asin in batch
+            if (domain_id, asin) in self.products
+        ]
+        raw = {"products": found}
+        if self.tokens_left is not None:
+            raw["tokensLeft"] = self.tokens_left
+        return {"raw": raw, "metadata": {}}
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    for key in (
+        "validated",
+        "errors",
+        "confirmed_mismatch",
+        "suspected_mismatch",
+        "unknown",
+    ):
+        monkeypatch.setitem(collect.stats, key, 0)
+
+
+@pytest.fixture(params=["automaton", "regex"])
+def matcher(request, monkeypatch):
+    """Run a test against the pyahocorasick path and the regex fallback."""
+    if request.param == "automaton":
+        assert collect._LAYOUT_AUTOMATON is not None
+    else:
+        monkeypatch.setattr(collect, "_LAYOUT_AUTOMATON", None)
+        monkeypatch.setattr(collect, "_QWERTZ_MODEL_AUTOMATON", None)
+    return request.param
+
+
+class TestFold:
+    def test_lowercases_and_strips_accents(self):
+        assert collect._fold("Teclado ESPAÑOL Clavier Français") == (
+            "teclado espanol clavier francais"
+        )
+
+    def test_leaves_non_foldable_characters(self):
+        assert collect._fold("Straße Ω") == "straße Ω"
+
+
+class TestLayoutMatchers:
+    @pytest.mark.parametrize(
+        "title, expected",
+        [
+            ("Cherry Tastatur, Deutsches Layout", ("qwertz", "title_keyword")),
+            ("Teclado Español USB", ("qwerty_es", "title_keyword")),
+            ("Clavier AZERTY mit QWERTZ-Aufdruck", ("qwertz", "title_keyword")),
+            ("Wireless keyboard", (None, "")),
+        ],
+    )
+    def test_title_keywords(self, matcher, title, expected):
+        assert collect.detect_layout_text(title) == expected
+
+    @pytest.mark.parametrize(
+        "title, brand, expected",
+        [
+            ("G80-3000 keyboard", "Cherry", ("qwertz", "brand_model_db")),
+            ("K120 DE Business", "Logitech", ("qwertz", "brand_model_db")),
+            ("K120 Business", "Logitech", (None, "")),
+        ],
+    )
+    def test_brand_models(self, matcher, title, brand, expected):
+        assert collect.detect_layout_brand_model(title, brand) == expected
+
+
+class TestIterCsv:
+    def test_missing_columns_and_short_rows_read_as_empty(self, tmp_path):
+        path = tmp_path / "asins.csv"
+        path.write_text("asin,title,market\nB000000001,Board,DE\n\nB000000002\n")
+
+        rows = list(collect._iter_csv(path, ("asin", "market", "brand")))
+
+        assert rows == [("B000000001", "DE", ""), ("B000000002", "", "")]
+
+
+class TestValidateAsins:
+    async def test_malformed_product_is_counted_and_skipped(self):
+        merged = {"B000000001": {"asin": "B000000001"}, "B000000002": {}}
+        client = FakeKeepaClient(
+            {
+                (3, "B000000001"): {"asin": "B000000001", "features": ["a", None]},
+                (3, "B000000002"): {"asin": "B000000002", "csv": PRICED_CSV},
+                (2, "B000000002"): {"asin": "B000000002", "title": "UK board"},
+            }
+        )
+
+        await collect.validate_asins(client, merged, ["DE", "UK"])
+
+        assert collect.stats["errors"] == 1
+        assert collect.stats["validated"] == 2
+        assert merged["B000000002"]["new_price_DE"] == 39.99
+        assert merged["B000000002"]["title"] == "UK board"
+
+    async def test_batches_merge_in_submission_order(self):
+        asin = "B000000001"
+        merged = {asin: {}}
+        client = FakeKeepaClient(
+            {
+                (3, asin): {"asin": asin, "title": "DE board", "csv": PRICED_CSV},
+                (2, asin): {"asin": asin, "title": "UK board", "csv": PRICED_CSV},
+            },
+            delay={3: 0.02},  # the DE batch is answered last
+        )
+
+        await collect.validate_asins(client, merged, ["DE", "UK"], concurrency=2)
+
+        entry = merged[asin]
+        assert entry["title"] == "DE board"
+        assert entry["title_UK"] == "UK board"
+        assert entry["present_markets"] == DE | UK
+
+    async def test_bucket_settles_every_batch(self):
+        merged = {f"B{i:09d}": {} for i in range(50)}  # three batches of 20
+        bucket = KeepaTokenBucket(1000, refill_per_minute=60)
+
+        await collect.validate_asins(
+            FakeKeepaClient({}, tokens_left=900), merged, ["DE"], bucket=bucket
+        )
+
+        assert bucket.in_flight == 0
+        assert bucket.tokens == pytest.approx(900, abs=1)
+
+
+class TestRunLayoutDetection:
+    def test_rows_only_for_target_markets_the_entry_is_present_in(self):
+        merged = {
+            "B000000001": {"title": "Deutsche Tastatur", "present_markets": DE | FR},
+        }
+
+        rows = collect.run_layout_detection(merged, ["UK", "FR", "IT"])
+
+        assert [(r["market"], r["is_mismatch"]) for r in rows] == [("FR", True)]
+
+    def test_explicit_market_wins_over_presence(self):
+        merged = {
+            "B000000001": {"title": "QWERTZ", "market": "UK", "present_markets": FR},
+        }
+
+        rows = collect.run_layout_detection(merged, ["UK", "FR"])
+
+        assert [r["market"] for r in rows] == ["UK"]
+
+    def test_unknown_layout_without_market_signal_keeps_one_row(self):
+        merged = {"B000000001": {"title": "Wireless keyboard"}}
+
+        rows = collect.run_layout_detection(merged, ["UK", "FR", "IT"])
+
+        assert [(r["market"], r["detected_layout"]) for r in rows] == [
+            ("UK", "unknown")
+        ]
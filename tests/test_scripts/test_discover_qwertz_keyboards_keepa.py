@@ -0,0 +1,142 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SCRIPT = (
+    Path(__file__).resolve().parents[2]
+    / "scripts"
+    / "archive"
+    / "discover_qwertz_keyboards_keepa.py"
+)
+
+spec = importlib.util.spec_from_file_location("discover_qwertz_keyboards_keepa", SCRIPT)
+discover = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(discover)
+
+PRICED_CSV = [[1, 2999], [1, 2999], [1, -1]]
+
+
+class FakeKeepaClient:
+    """Keepa stand-in: one search page per market, prices per (market, asin)."""
+
+    def __init__(self, search_results: dict, priced: dict, search_delay=None):
+        self.search_results = search_results
+        self.priced = priced
+        self.search_delay = search_delay or {}
+        self.product_calls = []
+
+    async def search_products(self, search_term, domain_id, page=1):
+        await asyncio.sleep(self.search_delay.get(domain_id, 0))
+        asins = self.search_results.get(domain_id, []) if page == 1 else []
+        return {"raw": {"products": [{"asin": a} for a in asins]}, "metadata": {}}
+
+    async def get_products(self, batch, domain_id):
+        self.product_calls.append((domain_id, list(batch)))
+        await asyncio.sleep(0)
+        products = [
+            {
+                "asin": asin,
+                "title": f"Tastatur {asin}",
+                "csv": PRICED_CSV if asin in self.priced.get(domain_id, ()) else [],
+            }
+            for asin in batch
+        ]
+        return {"raw": {"products": products}, "metadata": {}}
+
+
+def _asins(n: int) -> list[str]:
+    return [f"B{i:09d}" for i in range(n)]
+
+
+@pytest.fixture
+def ctx():
+    return discover.DiscoveryContext(seen=set())
+
+
+class TestCrossMarketDedupe:
+    async def test_asin_rejected_by_one_market_is_still_validated_by_another(self, ctx):
+        asin = "B000000001"
+        client = FakeKeepaClient(
+            search_results={3: [asin], 2: [asin]},
+            priced={3: set(), 2: {asin}},  # no price on DE, priced on UK
+        )
+
+        de = await discover.discover_market(client, "DE", 3, ctx=ctx, keywords=("kw",))
+        uk = await discover.discover_market(client, "UK", 2, ctx=ctx, keywords=("kw",))
+
+        assert de == []
+        assert [r["asin"] for r in uk] == [asin]
+
+    async def test_validated_asin_is_not_fetched_again_by_another_market(self, ctx):
+        asin = "B000000001"
+        client = FakeKeepaClient(
+            search_results={3: [asin], 2: [asin]},
+            priced={3: {asin}, 2: {asin}},
+        )
+
+        de = await discover.discover_market(client, "DE", 3, ctx=ctx, keywords=("kw",))
+        uk = await discover.discover_market(client, "UK", 2, ctx=ctx, keywords=("kw",))
+
+        assert [r["asin"] for r in de] == [asin]
+        assert uk == []
+        assert [domain for domain, _ in client.product_calls] == [3]
+
+    async def test_shared_asin_goes_to_the_earliest_market_in_domains_order(self):
+        asin = "B000000001"
+        client = FakeKeepaClient(
+            search_results={3: [asin], 2: [asin]},
+            priced={3: {asin}, 2: {asin}},
+            search_delay={3: 0.05},  # DE searches finish last
+        )
+
+        # Enough slots that UK's searches never queue behind DE's
+        results = {
+            market: records
+            async for market, records in discover.discover_all(client, concurrency=50)
+        }
+
+        assert [r["asin"] for r in results["DE"]] == [asin]
+        assert results["UK"] == []
+
+
+class TestValidateTarget:
+    async def test_asins_beyond_target_stay_open_to_other_markets(self, ctx):
+        asins = _asins(120)  # three /product batches of up to 50
+        client = FakeKeepaClient(
+            search_results={3: asins, 2: asins},
+            priced={3: set(asins), 2: set(asins)},
+        )
+
+        de = await discover.discover_market(
+            client, "DE", 3, max_results=1, ctx=ctx, keywords=("kw",)
+        )
+        uk = await discover.discover_market(
+            client, "UK", 2, max_results=200, ctx=ctx, keywords=("kw",)
+        )
+
+        assert len(de) == 1
+        assert len(ctx.seen) == len(asins)
+        assert sorted(r["asin"] for r in de + uk) == asins
+
+
+class TestAsinKey:
+    def test_case_insensitive(self):
+        assert discover.asin_key("b0abcdef12") == discover.asin_key("B0ABCDEF12")
+
+    def test_leading_zeros_are_significant(self):
+        assert discover.asin_key("0000000001") != discover.asin_key("1")
+        assert discover.asin_key("B000000001") != discover.asin_key("B00000001")
+
+
+class TestGetApiKey:
+    def test_environment_is_read_on_every_call(self, monkeypatch):
+        monkeypatch.setattr(
+            discover, "_env_file_values", lambda: {"KEEPA_API_KEY": '"from-file"'}
+        )
+        monkeypatch.delenv("KEEPA_API_KEY", raising=False)
+        assert discover.get_api_key() == "from-file"
+
+        monkeypatch.setenv("KEEPA_API_KEY", "from-env")
+        assert discover.get_api_key() == "from-env"
@@ -0,0 +1,51 @@
+"""
+Tests for json_codec module
+
+Covers: bytes round trip and agreement of the orjson and stdlib backends
+"""
+
+import pytest
+
+from src.utils import json_codec
+
+PAYLOAD = {
+    "asin": "B000000001",
+    "title": "Tastatur Ä",
+    "prices": [29.99, None],
+    3: True,
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(json_codec, "orjson", None)
+    return request.param
+
+
+class TestJsonCodec:
+    """Tests for json_loads / json_dumps / json_dumps_pretty"""
+
+    def test_round_trip_stringifies_non_str_keys(self, backend):
+        data = json_codec.json_dumps(PAYLOAD)
+        assert isinstance(data, bytes)
+        assert json_codec.json_loads(data) == {
+            "asin": "B000000001",
+            "title": "Tastatur Ä",
+            "prices": [29.99, None],
+            "3": True,
+        }
+
+    def test_compact_output(self, backend):
+        assert json_codec.json_dumps(PAYLOAD) == (
+            '{"asin":"B000000001","title":"Tastatur Ä",'
+            '"prices":[29.99,null],"3":true}'
+        ).encode("utf-8")
+
+    def test_pretty_output_indents_two_spaces(self, backend):
+        assert json_codec.json_dumps_pretty({"a": [1]}) == b'{\n  "a": [\n    1\n  ]\n}'
+
+    def test_default_handles_unsupported_types(self, backend):
+        assert json_codec.json_dumps({"p": {1, 2}}, default=sorted) == b'{"p":[1,2]}'
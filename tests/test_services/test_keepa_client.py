@@ -0,0 +1,50 @@
+"""
+Tests for the httpx-based KeepaClient
+
+Covers:
+- Reuse of an injected shared AsyncClient
+- Status code to exception mapping
+"""
+
+import httpx
+import pytest
+
+from src.services.keepa_client import KeepaAuthError, KeepaClient
+
+
+def _transport(calls: list, status: int = 200, payload: dict | None = None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(status, json=payload or {"products": []})
+
+    return httpx.MockTransport(handler)
+
+
+class TestSharedHttpClient:
+    """Tests for KeepaClient with an injected http_client"""
+
+    @pytest.mark.asyncio
+    async def test_requests_go_through_shared_client(self):
+        """All requests use the injected client and leave it open"""
+        calls = []
+        http = httpx.AsyncClient(transport=_transport(calls))
+        client = KeepaClient(api_key="test-key", http_client=http)
+
+        await client.get_products(["B000000001"], domain_id=3)
+        await client.search_products("tastatur", domain_id=3)
+
+        assert [r.url.path for r in calls] == ["/product", "/search"]
+        assert calls[0].url.params["asin"] == "B000000001"
+        assert not http.is_closed
+        await http.aclose()
+
+    @pytest.mark.asyncio
+    async def test_shared_client_errors_are_mapped(self):
+        """Status handling is unchanged when a shared client is used"""
+        calls = []
+        http = httpx.AsyncClient(transport=_transport(calls, status=401))
+        client = KeepaClient(api_key="test-key", http_client=http)
+
+        with pytest.raises(KeepaAuthError):
+            await client._make_request("product", {"key": "test-key"})
+        await http.aclose()
@@ -0,0 +1,52 @@
+"""
+Tests for KeepaTokenBucket
+
+Covers:
+- Seeding from a /token response
+- Re-syncing from tokensLeft while other requests are still in flight
+"""
+
+import pytest
+
+from src.services.keepa_token_bucket import KeepaTokenBucket
+
+
+class TestFromTokenStatus:
+    """Tests for building a bucket from a /token response"""
+
+    def test_seeds_balance_and_refill_rate(self):
+        bucket = KeepaTokenBucket.from_token_status(
+            {"tokensLeft": 120, "refillRate": 20}
+        )
+        assert bucket.tokens == 120
+        assert bucket.refill_per_second == pytest.approx(20 / 60)
+
+    @pytest.mark.parametrize("data", [None, {}, {"tokensLeft": 50}])
+    def test_none_without_refill_rate(self, data):
+        assert KeepaTokenBucket.from_token_status(data) is None
+
+
+class TestSync:
+    """Tests for realigning the local balance with tokensLeft"""
+
+    @pytest.mark.asyncio
+    async def test_in_flight_costs_stay_deducted(self):
+        """A response's tokensLeft does not cover requests still in flight"""
+        bucket = KeepaTokenBucket(100, refill_per_minute=0.001)
+        await bucket.acquire(20)
+        await bucket.acquire(20)
+
+        bucket.sync(80, 20)  # first request answered, second still pending
+
+        assert bucket.in_flight == 20
+        assert bucket.tokens == pytest.approx(60)
+
+    @pytest.mark.asyncio
+    async def test_failed_request_only_settles_in_flight(self):
+        bucket = KeepaTokenBucket(100, refill_per_minute=0.001)
+        await bucket.acquire(20)
+
+        bucket.sync(None, 20)
+
+        assert bucket.in_flight == 0
+        assert bucket.tokens == pytest.approx(80)
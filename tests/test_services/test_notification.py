@@ -281,6 +281,30 @@ class TestSendDiscord:
             assert call_args.args[0] == webhook_url
             assert call_args.kwargs["json"] == {"content": "Test discord message"}
 
+    async def test_send_discord_rate_limited_returns_retry_hint(
+        self, notification_service
+    ):
+        """send_discord — a 429 reports its status code and Retry-After seconds."""
+        with patch("src.services.notification.httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_response = MagicMock()
+            mock_response.status_code = 429
+            mock_response.text = "You are being rate limited."
+            mock_response.headers = {"Retry-After": "2.5"}
+            mock_client.post.return_value = mock_response
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client_class.return_value = mock_client
+
+            result = await notification_service.send_discord(
+                webhook_url="https://discord.com/api/webhooks/123/abc",
+                content="Test discord message",
+            )
+
+            assert result["success"] is False
+            assert result["error_code"] == 429
+            assert result["retry_after"] == 2.5
+
     async def test_send_discord_not_configured(self, notification_service):
         """send_discord — when not configured, is a no-op."""
         result = await notification_service.send_discord(